@@ -0,0 +1,98 @@
+"""
+Benchmark Lambda cold-start cost: module import time and handler initialization.
+
+Each run starts a fresh interpreter under `python -X importtime`, imports the handler the
+way the Lambda runtime does and reports the slowest imports (cumulative, in ms) plus the
+wall time to import and initialize `lambda.handler`. No AWS calls are made: clients are
+created lazily on first use and the catalog snapshot is disabled unless --snapshot is given.
+
+Exits non-zero when the median handler init time or total import time exceeds its budget,
+so it can gate CI.
+
+Usage: python bench/bench_cold_start.py [--runs 5] [--init-budget-ms 400] [--import-budget-ms 300]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Imports the handler in the child interpreter and prints its init time on the last line of stdout
+CHILD = """
+import importlib, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+importlib.import_module('lambda.handler')
+print(f"init_ms={{(time.perf_counter() - start) * 1000:.3f}}")
+"""
+
+_IMPORT_LINE = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def run_once(snapshot: str):
+    env = dict(os.environ)
+    env.setdefault('ACTIVITIES_TABLE', 'ImprovIndex-Activities-bench')
+    env.setdefault('AWS_REGION', 'us-east-2')
+    env['SNAPSHOT_PATH'] = snapshot
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD.format(src=SRC_DIR)],
+        capture_output=True, text=True, env=env, check=True
+    )
+    init_ms = float(result.stdout.strip().splitlines()[-1].split('=', 1)[1])
+
+    # Keep top-level entries only (no nesting indent) for the import total
+    imports = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        cumulative_us, indent, module = int(match[1]), match[2], match[3]
+        imports[module] = max(imports.get(module, 0), cumulative_us)
+        if len(indent) <= 1:
+            total_us += cumulative_us
+    return init_ms, total_us / 1000, imports
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument('--init-budget-ms', type=float, default=400.0, help="Median handler init budget")
+    parser.add_argument('--import-budget-ms', type=float, default=300.0, help="Median total import time budget")
+    parser.add_argument('--snapshot', default='', help="Catalog snapshot to load during init (default: none)")
+    args = parser.parse_args()
+
+    init_times, import_totals, runs = [], [], []
+    for _ in range(args.runs):
+        init_ms, import_ms, imports = run_once(args.snapshot)
+        init_times.append(init_ms)
+        import_totals.append(import_ms)
+        runs.append(imports)
+
+    # Median cumulative time per module across runs
+    modules = set().union(*runs)
+    medians = {module: statistics.median(run.get(module, 0) for run in runs) / 1000 for module in modules}
+    print(f"Slowest imports (median cumulative ms over {args.runs} runs):")
+    for module, ms in sorted(medians.items(), key=lambda entry: entry[1], reverse=True)[:args.top]:
+        print(f"  {ms:8.1f}  {module}")
+    for heavy in ('boto3', 'botocore.session'):
+        print(f"  {heavy} imported at init: {'yes' if heavy in modules else 'no'}")
+
+    init_median = statistics.median(init_times)
+    import_median = statistics.median(import_totals)
+    print(f"Handler init: median {init_median:.1f} ms, min {min(init_times):.1f} ms, max {max(init_times):.1f} ms")
+    print(f"Total import time: median {import_median:.1f} ms")
+
+    failures = []
+    if init_median > args.init_budget_ms:
+        failures.append(f"handler init {init_median:.1f} ms exceeds budget {args.init_budget_ms:.0f} ms")
+    if import_median > args.import_budget_ms:
+        failures.append(f"import time {import_median:.1f} ms exceeds budget {args.import_budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
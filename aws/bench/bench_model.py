@@ -0,0 +1,56 @@
+"""
+Benchmark the ImprovActivity DynamoDB item codec.
+
+Reports per-item decode (from_item) and encode (to_json) cost and the resident memory
+per activity, for both raw boto3 items and decoded slotted ImprovActivity objects.
+
+Usage: python bench/bench_model.py [--items 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from catalog_gen import generate_items
+from model.ImprovActivity import ImprovActivity
+
+def measure_memory(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100_000)
+    args = parser.parse_args()
+
+    items, raw_bytes = measure_memory(lambda: list(generate_items(args.items)))
+
+    start = time.perf_counter()
+    activities = [ImprovActivity.from_item(item) for item in items]
+    decode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for activity in activities:
+        activity.to_json()
+    encode_seconds = time.perf_counter() - start
+
+    del activities
+    _, decoded_bytes = measure_memory(lambda: [ImprovActivity.from_item(item) for item in items])
+
+    print(f"items:                {args.items}")
+    print(f"decode (from_item):   {decode_seconds / args.items * 1e6:.2f} us/item ({decode_seconds:.3f}s total)")
+    print(f"encode (to_json):     {encode_seconds / args.items * 1e6:.2f} us/item ({encode_seconds:.3f}s total)")
+    print(f"raw boto3 item:       {raw_bytes / args.items:.0f} bytes/item")
+    print(f"ImprovActivity:       {decoded_bytes / args.items:.0f} bytes/item (excluding strings shared with the raw item)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Generate synthetic ImprovActivity catalogs shaped like the real table.
+
+Items come out as the boto3 resource API returns them (numbers as Decimal, tags/skills as
+string sets), with long free-text fields drawn from an improv vocabulary so that search,
+compression and response sizes behave like production. Roughly one activity in seven is a
+variant of an earlier one. Output is deterministic for a given size and seed.
+
+Usage: python bench/catalog_gen.py --size 10k [--seed 0] [--output catalog.jsonl]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.catalog import format_updated_at, SYNC_PARTITION_ATTRIBUTE, SYNC_PARTITION
+from model.ImprovActivity import (
+    ActivityType, ActivityField, ActivityTag, ActivityLevel, ActivityComplexity, ActivitySkillCeiling,
+    ActivitySkill, PhysicalityLevel, VocalityLevel
+)
+
+# Catalog sizes used by the benchmarks
+SIZES = {'1k': 1_000, '10k': 10_000, '100k': 100_000}
+
+NAME_WORDS = (
+    "Freeze", "Tag", "Zip", "Zap", "Zop", "Yes", "And", "Party", "Quirks", "Emotional", "Rollercoaster",
+    "Slideshow", "Expert", "Panel", "Gibberish", "Translator", "Alphabet", "Scene", "Sound", "Effects",
+    "Dubbing", "Movie", "Genre", "Replay", "Press", "Conference", "Hat", "Rotation", "Story", "Spine",
+    "Arms", "Through", "Sleeves", "Bus", "Stop", "Typewriter", "Musical", "Hoedown", "Props", "Mirror",
+    "Questions", "Only", "Half", "Life", "Three", "Headed", "Broadway", "Director", "Cut", "Film",
+    "Noir", "Taxi", "Late", "Work", "Blind", "Line", "Pan", "Left", "World", "Worst", "Ding", "Bell",
+    "Chain", "Murder", "Mystery", "Space", "Jump", "Object", "Word", "Association", "Counting", "Circle"
+)
+
+VOCABULARY = (
+    "players", "scene", "partner", "audience", "suggestion", "host", "offer", "accept", "heighten",
+    "justify", "character", "relationship", "status", "emotion", "location", "object", "environment",
+    "stage", "backline", "edit", "sweep", "tag", "freeze", "clap", "point", "circle", "line", "pair",
+    "group", "volunteer", "timer", "round", "rule", "pattern", "game", "beat", "moment", "reaction",
+    "listen", "commit", "physical", "voice", "song", "rhyme", "rhythm", "gesture", "mime", "space",
+    "energy", "focus", "eye", "contact", "silence", "pause", "initiation", "premise", "tilt", "stakes",
+    "reveal", "callback", "opening", "monologue", "narrator", "story", "ending", "beginning", "middle",
+    "mistake", "failure", "celebrate", "support", "trust", "agreement", "specific", "detail", "choice",
+    "quickly", "slowly", "loudly", "quietly", "together", "alone", "again", "instead", "every", "each",
+    "first", "last", "next", "previous", "new", "old", "strange", "ordinary", "absurd", "grounded",
+    "teacher", "student", "coach", "ensemble", "team", "troupe", "workshop", "class", "rehearsal", "show"
+)
+
+SENTENCE_TEMPLATES = (
+    "The {0} starts by asking the {1} for a {2}.",
+    "Each {0} must {1} the {2} before the next {3} begins.",
+    "When the {0} claps, everyone freezes and a new {1} replaces the {2}.",
+    "Players should {0} their {1} and {2} every {3} they make.",
+    "Encourage the {0} to slow down and notice the {1} between the {2}.",
+    "If a {0} hesitates, the {1} simply moves on to the next {2}.",
+    "This works best with a {0} of four to eight who already trust their {1}.",
+    "Side coach the {0} to make {1} choices about {2} and {3}.",
+    "The {0} ends when the {1} calls scene or the {2} runs out.",
+    "Try a {0} version where the {1} only speaks in {2}.",
+)
+
+FIRST_NAMES = ("Viola", "Keith", "Del", "Charna", "Mick", "Jill", "Rebecca", "Tina", "Amy", "Colin", "Ryan", "Wayne")
+LAST_NAMES = ("Spolin", "Johnstone", "Close", "Halpern", "Napier", "Bernard", "Stockley", "Fey", "Poehler", "Mochrie")
+SOURCES = ("https://improwiki.com/en/wiki/improv/", "https://www.learnimprov.com/", "https://improvencyclopedia.org/games/")
+
+TYPES = [member.value for member in ActivityType]
+FIELDS = [member.value for member in ActivityField]
+TAGS = [member.value for member in ActivityTag]
+LEVELS = [member.value for member in ActivityLevel]
+COMPLEXITIES = [member.value for member in ActivityComplexity]
+SKILL_CEILINGS = [member.value for member in ActivitySkillCeiling]
+SKILLS = [member.value for member in ActivitySkill]
+PHYSICALITY = [member.value for member in PhysicalityLevel]
+VOCALITY = [member.value for member in VocalityLevel]
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def _sentences(rng: random.Random, count: int) -> List[str]:
+    sentences = []
+    for _ in range(count):
+        template = rng.choice(SENTENCE_TEMPLATES)
+        sentences.append(template.format(*rng.choices(VOCABULARY, k=4)))
+    return sentences
+
+def _pair(rng: random.Random, levels: List[str]) -> Dict[str, str]:
+    minimum = rng.randrange(len(levels))
+    return {'minimum': levels[minimum], 'recommended': levels[rng.randrange(minimum, len(levels))]}
+
+def generate_items(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield `count` synthetic activity items.
+    Parents gain variant ids as later items are generated, so materialize the whole catalog before serializing it.
+
+    Args:
+        count (int): Number of activities
+        seed (int): Random seed; the same count and seed always produce the same catalog
+
+    Yields:
+        dict: An activity as a boto3 resource item
+    """
+    rng = random.Random(seed)
+    # Drawing text from a fixed pool of sentences keeps generation fast at 100k items while still varying per item
+    pool = _sentences(rng, 4000)
+    variant_parents: List[Dict[str, Any]] = []
+
+    for n in range(count):
+        name_words = rng.sample(NAME_WORDS, rng.randint(1, 3))
+        activity_id = f"{'-'.join(word.lower() for word in name_words)}-{n:06d}"
+        players_minimum = rng.randint(1, 6)
+        # Durations are in minutes, as in the real table
+        duration_minimum = rng.choice((2, 5, 10, 15, 20))
+
+        item: Dict[str, Any] = {
+            'id': activity_id,
+            SYNC_PARTITION_ATTRIBUTE: SYNC_PARTITION,
+            'updated_at': format_updated_at(EPOCH + timedelta(seconds=rng.randrange(2 * 365 * 86400))),
+            'name': [' '.join(name_words)] + [' '.join(rng.sample(NAME_WORDS, 2)) for _ in range(rng.randint(0, 2))],
+            'brief': rng.choice(pool),
+            'summary': ' '.join(rng.choices(pool, k=rng.randint(3, 6))),
+            'description': ' '.join(rng.choices(pool, k=rng.randint(15, 40))),
+            'tips': {
+                'generic': rng.choices(pool, k=rng.randint(1, 4)),
+                'host': rng.choices(pool, k=rng.randint(0, 3)),
+                'player': rng.choices(pool, k=rng.randint(0, 3))
+            },
+            'requirements': {
+                'players': {'minimum': Decimal(players_minimum), 'recommended': Decimal(players_minimum + rng.randint(0, 6))},
+                'duration': {'minimum': Decimal(duration_minimum), 'average': Decimal(duration_minimum + rng.randrange(0, 30) // 2)},
+                'physicality': _pair(rng, PHYSICALITY),
+                'vocality': _pair(rng, VOCALITY)
+            },
+            'tags': set(rng.sample(TAGS, rng.randint(1, 4))),
+            'skills': set(rng.sample(SKILLS, rng.randint(1, 3))),
+            'field': rng.choices(FIELDS, weights=(4, 1))[0],
+            'type': rng.choice(TYPES),
+            'level': rng.choices(LEVELS, weights=(4, 3, 2, 1))[0],
+            'complexity': rng.choice(COMPLEXITIES),
+            'skill_ceiling': rng.choice(SKILL_CEILINGS),
+            'parent': None,
+            'variants': [],
+            'credits': [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(rng.randint(0, 2))],
+            'sources': [f"{rng.choice(SOURCES)}{activity_id}" for _ in range(rng.randint(0, 2))]
+        }
+
+        # Parents are yielded before their variants, so a variant's id is appended to an item already handed out
+        if variant_parents and rng.random() < 1 / 7:
+            parent = rng.choice(variant_parents)
+            item['parent'] = parent['id']
+            parent['variants'].append(activity_id)
+        elif len(variant_parents) < 500:
+            variant_parents.append(item)
+        else:
+            variant_parents[rng.randrange(len(variant_parents))] = item
+        yield item
+
+def to_json_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a generated item to plain JSON types (Decimal -> int, sets -> sorted lists).
+    """
+    if isinstance(item, dict):
+        return {key: to_json_item(value) for key, value in item.items()}
+    if isinstance(item, (list, tuple)):
+        return [to_json_item(value) for value in item]
+    if isinstance(item, set):
+        return sorted(item)
+    if isinstance(item, Decimal):
+        return int(item)
+    return item
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='1k', help=f"One of {', '.join(SIZES)} or an item count")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON Lines file to write (default: stdout)")
+    args = parser.parse_args()
+
+    count = SIZES.get(args.size) or int(args.size)
+    items = list(generate_items(count, args.seed))
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for item in items:
+            output.write(json.dumps(to_json_item(item), ensure_ascii=False) + '\n')
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,412 @@
+"""
+In-memory stand-in for the DynamoDB resource API, covering the surface used by lib/dynamo.py:
+Table(...).scan / query / get_item / put_item / delete_item and resource.batch_get_item / batch_write_item.
+
+Faults can be injected to exercise the retry and pagination paths:
+    page_size / page_bytes: cut scan and query pages early (DynamoDB stops at 1 MB by default)
+    throttle_rate:          fraction of requests that fail with ProvisionedThroughputExceededException
+                            (as they would once the SDK's own retries are exhausted)
+    unprocessed_rate:       fraction of batch keys/items returned as UnprocessedKeys/UnprocessedItems
+    latency:                seconds slept per request, to model the network round trip
+
+Install it for the handler with lib.aws.register_override('dynamodb', FakeDynamoDB(...)).
+FilterExpression and KeyConditionExpression accept boto3.dynamodb.conditions objects only.
+"""
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+# DynamoDB limits mirrored by the fake
+MAX_PAGE_BYTES = 1024 * 1024
+MAX_BATCH_GET_KEYS = 100
+MAX_BATCH_WRITE_ITEMS = 25
+
+def _copy(value: Any) -> Any:
+    # boto3 deserializes a fresh object graph for every response, so callers never share items
+    if isinstance(value, dict):
+        return {key: _copy(entry) for key, entry in value.items()}
+    if isinstance(value, list):
+        return [_copy(entry) for entry in value]
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+def _item_size(item: Dict[str, Any]) -> int:
+    return len(json.dumps(item, default=lambda value: sorted(value) if isinstance(value, set) else str(value)))
+
+def _resolve(item: Dict[str, Any], path: str) -> Tuple[bool, Any]:
+    value: Any = item
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return False, None
+        value = value[part]
+    return True, value
+
+def _error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+def evaluate(condition: Any, item: Dict[str, Any]) -> bool:
+    """
+    Evaluate a boto3 condition (Key(...)/Attr(...) expressions combined with &, |, ~) against an item.
+    """
+    if isinstance(condition, str):
+        raise NotImplementedError("FakeDynamoDB only supports boto3 condition objects, not expression strings")
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+    if operator == 'AND':
+        return evaluate(values[0], item) and evaluate(values[1], item)
+    if operator == 'OR':
+        return evaluate(values[0], item) or evaluate(values[1], item)
+    if operator == 'NOT':
+        return not evaluate(values[0], item)
+
+    present, value = _resolve(item, values[0].name)
+    if operator == 'attribute_exists':
+        return present
+    if operator == 'attribute_not_exists':
+        return not present
+    if not present:
+        return False
+    operands = values[1:]
+    try:
+        if operator == '=':
+            return value == operands[0]
+        if operator == '<>':
+            return value != operands[0]
+        if operator == '<':
+            return value < operands[0]
+        if operator == '<=':
+            return value <= operands[0]
+        if operator == '>':
+            return value > operands[0]
+        if operator == '>=':
+            return value >= operands[0]
+        if operator == 'BETWEEN':
+            return operands[0] <= value <= operands[1]
+        if operator == 'IN':
+            return value in operands[0]
+        if operator == 'begins_with':
+            return isinstance(value, str) and value.startswith(operands[0])
+        if operator == 'contains':
+            return operands[0] in value
+    except TypeError:
+        # Comparing different types never matches in DynamoDB
+        return False
+    raise NotImplementedError(f"Unsupported condition operator: {operator}")
+
+def project(item: Dict[str, Any], expression: str, names: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Apply a ProjectionExpression (with ExpressionAttributeNames aliases) to an item.
+    """
+    projected: Dict[str, Any] = {}
+    for path in expression.split(','):
+        parts = [names.get(part, part) for part in path.strip().split('.')]
+        present, value = _resolve(item, '.'.join(parts))
+        if not present:
+            continue
+        target = projected
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = _copy(value)
+    return projected
+
+class FakeTable:
+    """
+    One in-memory table. Items are kept in DynamoDB's scan order (by hash of the partition key),
+    and secondary indexes are declared as name -> (partition key, sort key or None).
+    """
+
+    def __init__(self, database: 'FakeDynamoDB', table_name: str, key: str = 'id',
+                 indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None):
+        self.database = database
+        self.table_name = table_name
+        self.key = key
+        self.indexes = dict(indexes or {})
+        self._items: Dict[Any, Dict[str, Any]] = {}
+        self._sizes: Dict[Any, int] = {}
+        self._order: Optional[List[Any]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def key_schema(self) -> List[Dict[str, str]]:
+        return [{'AttributeName': self.key, 'KeyType': 'HASH'}]
+
+    def load(self, items: Iterable[Dict[str, Any]]) -> 'FakeTable':
+        """
+        Bulk insert items without request accounting, fault injection or copying.
+        """
+        with self._lock:
+            for item in items:
+                self._items[item[self.key]] = item
+                self._sizes[item[self.key]] = _item_size(item)
+            self._order = None
+        return self
+
+    def _scan_order(self) -> List[Any]:
+        with self._lock:
+            if self._order is None:
+                self._order = sorted(self._items, key=lambda key: (zlib.crc32(str(key).encode('utf-8')), str(key)))
+            return self._order
+
+    def _page(self, operation: str, keys: List[Any], params: Dict[str, Any],
+              last_key: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        start = 0
+        exclusive_start_key = params.get('ExclusiveStartKey')
+        if exclusive_start_key:
+            try:
+                start = keys.index(exclusive_start_key[self.key]) + 1
+            except ValueError:
+                # Unlike DynamoDB, the fake cannot resume after a key that has since been deleted
+                raise _error('ValidationException', "The provided starting key is invalid", operation)
+        limit = params.get('Limit') or math.inf
+        page_size = self.database.page_size or math.inf
+        page_bytes = self.database.page_bytes
+
+        items, evaluated, size = [], 0, 0
+        filter_expression = params.get('FilterExpression')
+        position = start
+        while position < len(keys) and evaluated < min(limit, page_size) and size < page_bytes:
+            item = self._items[keys[position]]
+            position += 1
+            evaluated += 1
+            size += self._sizes[item[self.key]]
+            if filter_expression is not None and not evaluate(filter_expression, item):
+                continue
+            if 'ProjectionExpression' in params:
+                items.append(project(item, params['ProjectionExpression'], params.get('ExpressionAttributeNames', {})))
+            else:
+                items.append(_copy(item))
+
+        response: Dict[str, Any] = {'Items': items, 'Count': len(items), 'ScannedCount': evaluated}
+        if position < len(keys):
+            response['LastEvaluatedKey'] = last_key(self._items[keys[position - 1]])
+        self.database._account(operation, self.table_name, size, params, response)
+        return response
+
+    def scan(self, **params) -> Dict[str, Any]:
+        self.database._request('Scan')
+        keys = self._scan_order()
+        if 'Segment' in params:
+            segment, total = params['Segment'], params['TotalSegments']
+            keys = [key for key in keys if zlib.crc32(str(key).encode('utf-8')) % total == segment]
+        return self._page('Scan', keys, params, lambda item: {self.key: item[self.key]})
+
+    def query(self, **params) -> Dict[str, Any]:
+        self.database._request('Query')
+        condition = params['KeyConditionExpression']
+        index_name = params.get('IndexName')
+        if index_name is not None:
+            if index_name not in self.indexes:
+                raise _error('ValidationException', f"The table does not have the specified index: {index_name}", 'Query')
+            partition_key, sort_key = self.indexes[index_name]
+        else:
+            partition_key, sort_key = self.key, None
+
+        # Sparse index: items without the index keys are not in it
+        keys = [key for key in self._scan_order() if partition_key in self._items[key]
+                and (sort_key is None or sort_key in self._items[key]) and evaluate(condition, self._items[key])]
+        if sort_key is not None:
+            keys.sort(key=lambda key: self._items[key][sort_key], reverse=params.get('ScanIndexForward') is False)
+
+        def last_key(item: Dict[str, Any]) -> Dict[str, Any]:
+            evaluated_key = {self.key: item[self.key], partition_key: item[partition_key]}
+            if sort_key is not None:
+                evaluated_key[sort_key] = item[sort_key]
+            return evaluated_key
+
+        return self._page('Query', keys, params, last_key)
+
+    def get_item(self, Key: Dict[str, Any], **params) -> Dict[str, Any]:
+        self.database._request('GetItem')
+        item = self._items.get(Key[self.key])
+        response: Dict[str, Any] = {}
+        if item is not None:
+            if 'ProjectionExpression' in params:
+                response['Item'] = project(item, params['ProjectionExpression'], params.get('ExpressionAttributeNames', {}))
+            else:
+                response['Item'] = _copy(item)
+        self.database._account('GetItem', self.table_name, self._sizes.get(Key[self.key], 1), params, response)
+        return response
+
+    def put_item(self, Item: Dict[str, Any], **params) -> Dict[str, Any]:
+        self.database._request('PutItem')
+        size = self._put(Item)
+        response: Dict[str, Any] = {}
+        self.database._account('PutItem', self.table_name, size, params, response, write=True)
+        return response
+
+    def _put(self, item: Dict[str, Any]) -> int:
+        with self._lock:
+            if item[self.key] not in self._items:
+                self._order = None
+            self._items[item[self.key]] = _copy(item)
+            self._sizes[item[self.key]] = _item_size(item)
+            return self._sizes[item[self.key]]
+
+    def delete_item(self, Key: Dict[str, Any], **params) -> Dict[str, Any]:
+        self.database._request('DeleteItem')
+        with self._lock:
+            size = self._sizes.pop(Key[self.key], 1)
+            if self._items.pop(Key[self.key], None) is not None:
+                self._order = None
+        response: Dict[str, Any] = {}
+        self.database._account('DeleteItem', self.table_name, size, params, response, write=True)
+        return response
+
+class _MissingTable:
+    # Like boto3, Table() is lazy: a table that does not exist only fails once it is used
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+
+    def __getattr__(self, operation: str):
+        def fail(**params):
+            raise _error('ResourceNotFoundException', f"Requested resource not found: Table: {self.table_name} not found", operation)
+        return fail
+
+class FakeDynamoDB:
+    """
+    In-memory DynamoDB service resource. Thread-safe; counts requests and consumed capacity per operation.
+    """
+
+    def __init__(self, page_size: Optional[int] = None, page_bytes: int = MAX_PAGE_BYTES, throttle_rate: float = 0.0,
+                 unprocessed_rate: float = 0.0, latency: float = 0.0, seed: int = 0):
+        self.page_size = page_size
+        self.page_bytes = page_bytes
+        self.throttle_rate = throttle_rate
+        self.unprocessed_rate = unprocessed_rate
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self.capacity_units: Counter = Counter()
+        self._tables: Dict[str, FakeTable] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create_table(self, table_name: str, key: str = 'id',
+                     indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None) -> FakeTable:
+        table = FakeTable(self, table_name, key, indexes)
+        self._tables[table_name] = table
+        return table
+
+    def Table(self, table_name: str) -> Any:
+        table = self._tables.get(table_name)
+        return _MissingTable(table_name) if table is None else table
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.throttled.clear()
+            self.capacity_units.clear()
+
+    def batch_get_item(self, RequestItems: Dict[str, Dict[str, Any]], **params) -> Dict[str, Any]:
+        self._request('BatchGetItem')
+        if sum(len(request['Keys']) for request in RequestItems.values()) > MAX_BATCH_GET_KEYS:
+            raise _error('ValidationException', "Too many items requested for the BatchGetItem call", 'BatchGetItem')
+
+        responses: Dict[str, List[Dict[str, Any]]] = {}
+        consumed = []
+        unprocessed: Dict[str, Dict[str, Any]] = {}
+        for table_name, request in RequestItems.items():
+            table = self._tables.get(table_name)
+            if table is None:
+                raise _error('ResourceNotFoundException', f"Requested resource not found: Table: {table_name} not found", 'BatchGetItem')
+            options = {name: value for name, value in request.items() if name != 'Keys'}
+            found, skipped, size = [], [], 0
+            for key in request['Keys']:
+                if self._chance(self.unprocessed_rate):
+                    skipped.append(key)
+                    continue
+                item = table._items.get(key[table.key])
+                if item is None:
+                    continue
+                size += table._sizes[key[table.key]]
+                if 'ProjectionExpression' in options:
+                    found.append(project(item, options['ProjectionExpression'], options.get('ExpressionAttributeNames', {})))
+                else:
+                    found.append(_copy(item))
+            responses[table_name] = found
+            if skipped:
+                unprocessed[table_name] = {**options, 'Keys': skipped}
+            capacity: Dict[str, Any] = {}
+            self._account('BatchGetItem', table_name, size, params, capacity)
+            consumed.extend(capacity.values())
+        response = {'Responses': responses, 'UnprocessedKeys': unprocessed}
+        if consumed:
+            response['ConsumedCapacity'] = consumed
+        return response
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]], **params) -> Dict[str, Any]:
+        self._request('BatchWriteItem')
+        if sum(len(requests) for requests in RequestItems.values()) > MAX_BATCH_WRITE_ITEMS:
+            raise _error('ValidationException', "Too many items requested for the BatchWriteItem call", 'BatchWriteItem')
+
+        consumed = []
+        unprocessed: Dict[str, List[Dict[str, Any]]] = {}
+        for table_name, requests in RequestItems.items():
+            table = self._tables.get(table_name)
+            if table is None:
+                raise _error('ResourceNotFoundException', f"Requested resource not found: Table: {table_name} not found", 'BatchWriteItem')
+            keys = [(request.get('PutRequest') or {}).get('Item', {}).get(table.key) or request['DeleteRequest']['Key'][table.key]
+                    for request in requests]
+            if len(set(keys)) != len(keys):
+                raise _error('ValidationException', "Provided list of item keys contains duplicates", 'BatchWriteItem')
+            units = 0.0
+            for request in requests:
+                if self._chance(self.unprocessed_rate):
+                    unprocessed.setdefault(table_name, []).append(request)
+                    continue
+                if 'PutRequest' in request:
+                    size = table._put(request['PutRequest']['Item'])
+                else:
+                    key = request['DeleteRequest']['Key'][table.key]
+                    with table._lock:
+                        size = table._sizes.pop(key, 1)
+                        if table._items.pop(key, None) is not None:
+                            table._order = None
+                capacity: Dict[str, Any] = {}
+                self._account('BatchWriteItem', table_name, size, {'ReturnConsumedCapacity': 'TOTAL'}, capacity, write=True)
+                units += capacity['ConsumedCapacity']['CapacityUnits']
+            if params.get('ReturnConsumedCapacity') in ('TOTAL', 'INDEXES'):
+                consumed.append({'TableName': table_name, 'CapacityUnits': units})
+        response: Dict[str, Any] = {'UnprocessedItems': unprocessed}
+        if consumed:
+            response['ConsumedCapacity'] = consumed
+        return response
+
+    def _chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _request(self, operation: str) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests[operation] += 1
+        if self._chance(self.throttle_rate):
+            with self._lock:
+                self.throttled[operation] += 1
+            raise _error('ProvisionedThroughputExceededException', "The level of configured provisioned throughput for the table was exceeded", operation)
+
+    def _account(self, operation: str, table_name: str, size: int, params: Dict[str, Any],
+                 response: Dict[str, Any], write: bool = False) -> None:
+        # 4 KB read units (halved for eventually consistent reads), 1 KB write units
+        if write:
+            units = float(max(1, math.ceil(size / 1024)))
+        else:
+            units = max(1, math.ceil(size / 4096)) * (1.0 if params.get('ConsistentRead') else 0.5)
+        with self._lock:
+            self.capacity_units[operation] += units
+        if params.get('ReturnConsumedCapacity') in ('TOTAL', 'INDEXES'):
+            response['ConsumedCapacity'] = {'TableName': table_name, 'CapacityUnits': units}
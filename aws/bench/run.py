@@ -0,0 +1,349 @@
+"""
+Benchmark lambda_handler end to end against an in-memory DynamoDB and a synthetic catalog.
+
+Every endpoint and code path (cold catalog load, warm catalog, 304s, compression, filters,
+pagination, DynamoDB fallbacks, throttling and UnprocessedKeys retries) is a scenario. Each
+scenario reports latency percentiles, response bytes on the wire, DynamoDB requests per call,
+peak Python allocations per request and the process peak RSS.
+
+Results are compared with bench/baselines/<size>.json when it exists; the run exits non-zero
+if a scenario regresses beyond the tolerances. Record a new baseline with --save-baseline.
+Latency baselines are machine-specific, so compare runs from the same host (or CI runner type).
+
+Usage: python bench/run.py [--size 1k|10k|100k] [--iterations 200] [--scenario REGEX] [--save-baseline]
+"""
+import argparse
+import base64
+import importlib
+import json
+import logging
+import os
+import platform
+import re
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from catalog_gen import SIZES, generate_items
+from fake_dynamo import FakeDynamoDB
+from lib.catalog import UPDATED_AT_INDEX, SYNC_PARTITION_ATTRIBUTE
+
+TABLE_NAME = 'ImprovIndex-Activities-bench'
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+
+# Regression tolerances: relative, plus an absolute slack so sub-millisecond paths do not flap.
+# Latency is noisy on shared runners, so the deterministic metrics (bytes, requests, allocations) gate tighter.
+LATENCY_TOLERANCE = 0.5
+TAIL_LATENCY_TOLERANCE = 1.0
+LATENCY_SLACK_MS = 0.1
+BYTES_TOLERANCE = 0.02
+REQUESTS_TOLERANCE = 0.1
+ALLOCATION_TOLERANCE = 0.25
+RSS_TOLERANCE = 0.25
+ERROR_RATE_SLACK = 0.02
+
+def make_event(path: str, query: Optional[Dict[str, str]] = None, headers: Optional[Dict[str, str]] = None,
+               path_params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return {
+        'httpMethod': 'GET',
+        'resource': path,
+        'path': path.replace('{id}', (path_params or {}).get('id', '')),
+        'queryStringParameters': query,
+        'headers': headers or {},
+        'pathParameters': path_params
+    }
+
+def wire_bytes(response: Dict[str, Any]) -> int:
+    body = response.get('body') or ''
+    if response.get('isBase64Encoded'):
+        return len(base64.b64decode(body))
+    return len(body.encode('utf-8'))
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+class Scenario:
+    """
+    One request shape. `event` builds the request; `before` runs untimed ahead of every request;
+    `setup`/`teardown` run once around the scenario. Heavy scenarios run a fraction of the iterations.
+    """
+
+    def __init__(self, name: str, event: Callable[[], Dict[str, Any]], before: Optional[Callable[[], None]] = None,
+                 setup: Optional[Callable[[], None]] = None, teardown: Optional[Callable[[], None]] = None,
+                 heavy: bool = False):
+        self.name = name
+        self.event = event
+        self.before = before or (lambda: None)
+        self.setup = setup or (lambda: None)
+        self.teardown = teardown or (lambda: None)
+        self.heavy = heavy
+
+def build_scenarios(handler: Any, database: FakeDynamoDB, ids: List[str]) -> List[Scenario]:
+    from lib import http
+    from lib.fragments import FragmentCache
+    from lib.search import SearchIndex
+
+    cache = handler.activity_cache
+    sample_ids = ids[::max(1, len(ids) // 50)][:50]
+
+    def cold():
+        # As after a container start: no catalog, fragments, search index or compressed bodies
+        cache.invalidate()
+        handler.fragment_cache = FragmentCache()
+        handler.search_index = SearchIndex()
+        http._compressed_cache.clear()
+
+    def warm():
+        cache.get()
+
+    def with_faults(**faults):
+        def apply():
+            cache.invalidate()
+            for name, value in faults.items():
+                setattr(database, name, value)
+        return apply
+
+    def clear_faults():
+        database.page_size = None
+        database.throttle_rate = 0.0
+        database.unprocessed_rate = 0.0
+
+    def not_modified_event():
+        return make_event('/activities', headers={'If-None-Match': cache.get().etag({})})
+
+    def second_page_event():
+        first = handler.lambda_handler(make_event('/activities', {'limit': '100', 'tags': 'musical'}), None)
+        cursor = json.loads(first['body'])['cursor']
+        return make_event('/activities', {'limit': '100', 'tags': 'musical', 'cursor': cursor})
+
+    family: Dict[str, str] = {}
+
+    def family_event():
+        # The activity with the most variants, chosen once the catalog is resident
+        if 'id' not in family:
+            catalog = cache.get()
+            children = catalog.family_index.children
+            family['id'] = catalog.items[max(range(len(catalog)), key=lambda position: len(children[position]))].id
+        return make_event('/activities/{id}/family', {'view': 'card'}, path_params={'id': family['id']})
+
+    gzip = {'Accept-Encoding': 'gzip'}
+    scenarios = [
+        # Paths that read DynamoDB directly because no catalog is resident
+        Scenario('page_from_table', lambda: make_event('/activities', {'limit': '100'}), setup=cache.invalidate),
+        Scenario('ids_batch_get', lambda: make_event('/activities', {'ids': ','.join(sample_ids)}), setup=cache.invalidate),
+        Scenario('ids_batch_get_unprocessed', lambda: make_event('/activities', {'ids': ','.join(sample_ids)}),
+                 setup=with_faults(unprocessed_rate=0.1), teardown=clear_faults),
+        Scenario('activity_get_item', lambda: make_event('/activities/{id}', path_params={'id': ids[len(ids) // 2]}),
+                 setup=cache.invalidate),
+        # Generated updated_at values span 2024-2025, so this returns roughly the last 1% of the catalog
+        Scenario('delta_since', lambda: make_event('/activities', {'since': '2025-12-24T00:00:00Z'}), setup=cache.invalidate),
+        Scenario('activity_get_item_throttled', lambda: make_event('/activities/{id}', path_params={'id': ids[len(ids) // 2]}),
+                 setup=with_faults(throttle_rate=0.05), teardown=clear_faults),
+
+        # Catalog loads
+        Scenario('cold_load', lambda: make_event('/activities', headers=gzip), before=cold, heavy=True),
+        Scenario('cold_load_small_pages', lambda: make_event('/activities', headers=gzip), before=cold,
+                 setup=with_faults(page_size=100), teardown=clear_faults, heavy=True),
+        Scenario('reload_unchanged', lambda: make_event('/activities', headers=gzip), before=cache.invalidate, heavy=True),
+        Scenario('cold_search', lambda: make_event('/activities/search', {'q': 'freeze scene'}), before=cold, heavy=True),
+        # Reloads keep the shared search index, so an unchanged catalog is not re-tokenized
+        Scenario('reload_search', lambda: make_event('/activities/search', {'q': 'freeze scene'}), before=cache.invalidate, heavy=True),
+
+        # Warm catalog
+        Scenario('list_full', lambda: make_event('/activities'), setup=warm),
+        Scenario('list_full_gzip', lambda: make_event('/activities', headers=gzip), setup=warm),
+        Scenario('list_not_modified', not_modified_event, setup=warm),
+        Scenario('list_filtered', lambda: make_event('/activities', {'tags': 'musical,narrative', 'level': 'beginner'}), setup=warm),
+        Scenario('list_facets', lambda: make_event('/activities', {'facets': 'true', 'limit': '20'}), setup=warm),
+        Scenario('list_page', lambda: make_event('/activities', {'limit': '100'}), setup=warm),
+        Scenario('list_page_cursor', second_page_event, setup=warm),
+        Scenario('list_card_view', lambda: make_event('/activities', {'view': 'card', 'limit': '100'}), setup=warm),
+        Scenario('ids_catalog', lambda: make_event('/activities', {'ids': ','.join(sample_ids)}), setup=warm),
+        Scenario('activity_catalog', lambda: make_event('/activities/{id}', path_params={'id': ids[len(ids) // 2]}), setup=warm),
+        Scenario('activity_missing', lambda: make_event('/activities/{id}', path_params={'id': 'no-such-activity'}), setup=warm),
+        Scenario('activity_family', family_event, setup=warm),
+        Scenario('similar', lambda: make_event('/activities/{id}/similar', {'k': '10', 'view': 'card'},
+                                               path_params={'id': ids[len(ids) // 3]}), setup=warm),
+        Scenario('search', lambda: make_event('/activities/search', {'q': 'heighten the scene partner'}), setup=warm),
+        Scenario('plan', lambda: make_event('/plans', {'players': '6', 'minutes': '90', 'level': 'beginner',
+                                                       'skills': 'listening,heightening', 'view': 'card'}), setup=warm),
+        Scenario('plan_full', lambda: make_event('/plans', {'players': '6', 'minutes': '90'}), setup=warm),
+        Scenario('search_prefix', lambda: make_event('/activities/search', {'q': 'freeze ta', 'view': 'card'}), setup=warm),
+    ]
+    if http.brotli is not None:
+        scenarios.append(Scenario('list_full_br', lambda: make_event('/activities', headers={'Accept-Encoding': 'br'}), setup=warm))
+    return scenarios
+
+def run_scenario(handler: Any, database: FakeDynamoDB, scenario: Scenario, iterations: int, warmup: int,
+                 allocation_samples: int) -> Dict[str, Any]:
+    if scenario.heavy:
+        iterations, warmup, allocation_samples = max(3, iterations // 50), 1, 1
+    scenario.setup()
+    try:
+        for _ in range(warmup):
+            scenario.before()
+            handler.lambda_handler(scenario.event(), None)
+
+        database.reset_stats()
+        latencies, statuses, sizes = [], {}, []
+        for _ in range(iterations):
+            scenario.before()
+            event = scenario.event()
+            start = time.perf_counter()
+            response = handler.lambda_handler(event, None)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(response['statusCode'])] = statuses.get(str(response['statusCode']), 0) + 1
+            # Injected failures would skew the size of the scenario's normal response
+            if response['statusCode'] < 500:
+                sizes.append(wire_bytes(response))
+        requests = sum(database.requests.values())
+
+        peaks = []
+        tracemalloc.start()
+        for _ in range(allocation_samples):
+            scenario.before()
+            event = scenario.event()
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            handler.lambda_handler(event, None)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        tracemalloc.stop()
+    finally:
+        scenario.teardown()
+
+    errors = sum(count for status, count in statuses.items() if status.startswith('5'))
+    return {
+        'iterations': iterations,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p90_ms': round(percentile(latencies, 0.90), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(max(latencies), 3),
+        'response_bytes': int(statistics.median(sizes)) if sizes else 0,
+        'dynamo_requests': round(requests / iterations, 2),
+        'alloc_peak_kb': round(statistics.median(peaks) / 1024, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'error_rate': round(errors / iterations, 3),
+        'statuses': statuses
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            latency_tolerance: float = LATENCY_TOLERANCE) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, tolerance in (('p50_ms', latency_tolerance), ('p99_ms', max(latency_tolerance, TAIL_LATENCY_TOLERANCE))):
+            limit = max(base[metric] * (1 + tolerance), base[metric] + LATENCY_SLACK_MS)
+            if result[metric] > limit:
+                regressions.append(f"{name}: {metric} {result[metric]} > {base[metric]} (+{tolerance:.0%})")
+        for metric, tolerance in (('response_bytes', BYTES_TOLERANCE), ('dynamo_requests', REQUESTS_TOLERANCE),
+                                  ('alloc_peak_kb', ALLOCATION_TOLERANCE), ('peak_rss_mb', RSS_TOLERANCE)):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {result[metric]} > {base[metric]} (+{tolerance:.0%})")
+        if result['error_rate'] > base['error_rate'] + ERROR_RATE_SLACK:
+            regressions.append(f"{name}: error_rate {result['error_rate']} > {base['error_rate']}")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='1k', choices=list(SIZES))
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--allocation-samples', type=int, default=5, help="Requests per scenario traced for allocations")
+    parser.add_argument('--scenario', help="Only run scenarios whose name matches this regular expression")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency-tolerance', type=float, default=LATENCY_TOLERANCE,
+                        help="Allowed relative p50 slowdown before a scenario counts as regressed")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Write results to {BASELINE_DIR}/<size>.json")
+    args = parser.parse_args()
+
+    # Configure the handler as deployed, minus the snapshot, with a catalog that never expires mid-run
+    os.environ.update({
+        'ACTIVITIES_TABLE': TABLE_NAME,
+        'SNAPSHOT_PATH': '',
+        'CATALOG_CACHE_TTL': '86400',
+        'CATALOG_CACHE_MAX_STALE': '0',
+        'CURSOR_SIGNING_KEY': 'bench',
+        'AWS_REGION': os.environ.get('AWS_REGION', 'us-east-2'),
+    })
+
+    # Log records are still built, as in Lambda, but not printed
+    logging.getLogger().addHandler(logging.NullHandler())
+
+    start = time.perf_counter()
+    items = list(generate_items(SIZES[args.size], args.seed))
+    database = FakeDynamoDB(seed=args.seed)
+    database.create_table(TABLE_NAME, indexes={UPDATED_AT_INDEX: (SYNC_PARTITION_ATTRIBUTE, 'updated_at')}).load(items)
+    ids = [item['id'] for item in items]
+    del items
+    print(f"Generated {len(ids)} activities in {time.perf_counter() - start:.1f}s")
+
+    from lib import metrics
+    from lib.aws import register_override
+    register_override('dynamodb', database)
+    # EMF lines are still built and written, as in Lambda, but not printed
+    metrics.set_output(open(os.devnull, 'w'))
+    handler = importlib.import_module('lambda.handler')
+
+    scenarios = build_scenarios(handler, database, ids)
+    if args.scenario:
+        scenarios = [scenario for scenario in scenarios if re.search(args.scenario, scenario.name)]
+
+    results = {}
+    print(f"{'scenario':30} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'bytes':>10} {'ddb/req':>8} {'alloc KB':>9} {'rss MB':>7}  status")
+    for scenario in scenarios:
+        result = run_scenario(handler, database, scenario, args.iterations, args.warmup, args.allocation_samples)
+        results[scenario.name] = result
+        statuses = ' '.join(f"{status}x{count}" for status, count in sorted(result['statuses'].items()))
+        print(f"{scenario.name:30} {result['p50_ms']:9.3f} {result['p90_ms']:9.3f} {result['p99_ms']:9.3f} "
+              f"{result['response_bytes']:10d} {result['dynamo_requests']:8.2f} {result['alloc_peak_kb']:9.1f} "
+              f"{result['peak_rss_mb']:7.1f}  {statuses}")
+
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.size}.json")
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'size': args.size,
+                'items': len(ids),
+                'seed': args.seed,
+                'python': platform.python_version(),
+                'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'scenarios': results
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; run with --save-baseline to record one")
+        return 0
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('python') != platform.python_version():
+        print(f"Note: baseline was recorded on Python {baseline.get('python')} ({baseline.get('machine')})")
+    regressions = compare(results, baseline['scenarios'], args.latency_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions against {baseline_path}")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Export the activities table into a catalog snapshot shipped with the Lambda code.
+
+The snapshot holds the pre-encoded JSON of every activity, the decoded catalog, its filter
+and search indexes, precompressed GET /activities bodies and a content hash, so a cold
+start can serve requests without touching DynamoDB.
+
+Usage: python scripts/build_snapshot.py --table ImprovIndex-Activities-int [--output src/snapshot/catalog.snap]
+"""
+import argparse
+import base64
+import importlib
+import logging
+import os
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from botocore.exceptions import ClientError
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--table', required=True, help="DynamoDB activities table name")
+    parser.add_argument('--output', default=os.path.join(SRC_DIR, 'snapshot', 'catalog.snap'))
+    parser.add_argument('--segments', type=int, default=4, help="Parallel scan segments")
+    parser.add_argument('--similar-k', type=int, default=20, help="Neighbours precomputed per activity for /similar (0 disables)")
+    parser.add_argument('--allow-missing', action='store_true', help="Succeed without a snapshot if the table does not exist yet")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    # Configure the handler as it runs in Lambda, minus loading an existing snapshot
+    os.environ['ACTIVITIES_TABLE'] = args.table
+    os.environ['SNAPSHOT_PATH'] = ''
+
+    from lib.catalog import Catalog
+    from lib.dynamo import get_table, parallel_scan
+    from lib.snapshot import write_snapshot
+    handler = importlib.import_module('lambda.handler')
+
+    start = time.perf_counter()
+    try:
+        items = parallel_scan(get_table(args.table), segments=args.segments)
+    except ClientError as e:
+        if args.allow_missing and e.response.get('Error', {}).get('Code') == 'ResourceNotFoundException':
+            print(f"Table {args.table} does not exist, skipping snapshot")
+            return 0
+        raise
+
+    catalog = Catalog.from_items(items, handler.fragment_cache, handler.search_index)
+    handler.activity_cache.put(catalog)
+
+    # Produce the full-catalog bodies through the real handler so they match runtime responses byte for byte
+    from lib.http import brotli
+    bodies = {}
+    for encoding in ('gzip', 'br') if brotli is not None else ('gzip',):
+        response = handler.lambda_handler({
+            'httpMethod': 'GET',
+            'resource': '/activities',
+            'headers': {'Accept-Encoding': encoding}
+        }, None)
+        if response.get('isBase64Encoded') and response['headers'].get('Content-Encoding') == encoding:
+            bodies[encoding] = base64.b64decode(response['body'])
+
+    header = write_snapshot(args.output, catalog, bodies, args.similar_k)
+    size = os.path.getsize(args.output)
+    print(f"Wrote {args.output}: {header['count']} activities, {size} bytes, "
+          f"content hash {header['content_hash'][:12]}, {time.perf_counter() - start:.1f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
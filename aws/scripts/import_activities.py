@@ -0,0 +1,182 @@
+"""
+Bulk import (upsert) activities into the activities table.
+
+Reads activities from JSON Lines files, JSON files (one object or a list) or directories of
+them, validates each against the ImprovActivity model and its enums, and writes only the ones
+whose content changed. Each stored activity carries a `content_hash` of its canonical form;
+activities whose hash matches the stored one are skipped, and changed ones get a fresh
+`updated_at`. Writes go through BatchWriteItem on a bounded worker pool, retrying unprocessed
+items.
+
+Every written activity also carries the constant sync partition attribute that keys the
+updated_at index behind GET /activities?since=; stored activities without it are rewritten even
+if unchanged, which backfills the index. With --delete-missing, stored activities absent from the
+input are replaced by tombstones (id, updated_at, deleted) so delta syncs see the deletion.
+
+Usage: python scripts/import_activities.py --table ImprovIndex-Activities-int activities.jsonl [more files or directories]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from lib.catalog import format_updated_at, SYNC_PARTITION_ATTRIBUTE, SYNC_PARTITION
+from model.ImprovActivity import ImprovActivity
+
+# Attributes managed by the importer rather than taken from the input
+MANAGED_ATTRIBUTES = ('updated_at', 'content_hash', SYNC_PARTITION_ATTRIBUTE, 'deleted')
+
+def iter_sources(paths: List[str]) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield (location, raw activity) from files and directories, one activity at a time.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                files = [os.path.join(root, name) for name in sorted(names) if name.endswith(('.json', '.jsonl'))]
+                yield from iter_sources(files)
+            continue
+        with open(path, encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f"{path}:{line_number}", json.loads(line)
+            else:
+                document = json.load(f)
+                for index, raw in enumerate(document if isinstance(document, list) else [document]):
+                    yield f"{path}[{index}]", raw
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """
+    Hash of an activity's canonical item, excluding the importer-managed attributes.
+    """
+    content = {key: value for key, value in item.items() if key not in MANAGED_ATTRIBUTES}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def stored_hashes(table, segments: int) -> Dict[str, Optional[str]]:
+    """
+    Stored content hash per id: None for tombstones, '' for activities missing the sync partition (always rewritten).
+    """
+    from lib.dynamo import parallel_scan, build_projection
+    items = parallel_scan(table, segments=segments, **build_projection(['id', 'content_hash', 'deleted', SYNC_PARTITION_ATTRIBUTE]))
+    return {
+        item['id']: None if item.get('deleted') else item.get('content_hash', '') if item.get(SYNC_PARTITION_ATTRIBUTE) else ''
+        for item in items
+    }
+
+def timestamp() -> str:
+    return format_updated_at(datetime.now(timezone.utc))
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help="JSON Lines / JSON files or directories")
+    parser.add_argument('--table', required=True, help="DynamoDB activities table name")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent BatchWriteItem requests")
+    parser.add_argument('--flush-size', type=int, default=1000, help="Changed activities buffered per write round")
+    parser.add_argument('--segments', type=int, default=4, help="Parallel scan segments when reading stored hashes")
+    parser.add_argument('--force', action='store_true', help="Write every activity, even if unchanged")
+    parser.add_argument('--dry-run', action='store_true', help="Validate and diff without writing")
+    parser.add_argument('--skip-invalid', action='store_true', help="Import valid activities even if some are invalid")
+    parser.add_argument('--delete-missing', action='store_true', help="Tombstone stored activities absent from the input")
+    args = parser.parse_args()
+    if args.delete_missing and args.force:
+        parser.error("--delete-missing needs the stored ids, so it cannot be combined with --force")
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(name)s: %(message)s')
+
+    from lib.dynamo import get_table, batch_write_items
+    table = get_table(args.table)
+
+    start = time.perf_counter()
+    existing = {} if args.force else stored_hashes(table, args.segments)
+    diff_seconds = time.perf_counter() - start
+
+    # Validate everything first unless invalid input may be skipped, so a bad file writes nothing
+    if not args.skip_invalid:
+        invalid = 0
+        for location, raw in iter_sources(args.paths):
+            try:
+                ImprovActivity.from_item(raw)
+            except (ValueError, TypeError, AttributeError) as e:
+                invalid += 1
+                print(f"Invalid activity at {location}: {e}", file=sys.stderr)
+        if invalid:
+            print(f"{invalid} invalid activities, nothing imported (use --skip-invalid to import the rest)", file=sys.stderr)
+            return 1
+
+    counts = {'read': 0, 'invalid': 0, 'duplicate': 0, 'unchanged': 0, 'written': 0, 'deleted': 0}
+    capacity_units = 0.0
+    seen = set()
+    pending: List[Dict[str, Any]] = []
+
+    def flush(counter: str = 'written') -> None:
+        nonlocal capacity_units
+        if pending and not args.dry_run:
+            result = batch_write_items(table, pending, max_workers=args.workers)
+            capacity_units += result['capacity_units']
+        counts[counter] += len(pending)
+        pending.clear()
+
+    write_start = time.perf_counter()
+    for location, raw in iter_sources(args.paths):
+        counts['read'] += 1
+        try:
+            item = ImprovActivity.from_item(raw).to_item()
+        except (ValueError, TypeError, AttributeError) as e:
+            counts['invalid'] += 1
+            print(f"Skipping invalid activity at {location}: {e}", file=sys.stderr)
+            continue
+        if item['id'] in seen:
+            counts['duplicate'] += 1
+            print(f"Duplicate activity {item['id']!r} at {location}, the earlier one is kept", file=sys.stderr)
+            continue
+        seen.add(item['id'])
+
+        item_hash = content_hash(item)
+        if existing.get(item['id']) == item_hash:
+            counts['unchanged'] += 1
+            continue
+        item['updated_at'] = timestamp()
+        item['content_hash'] = item_hash
+        item[SYNC_PARTITION_ATTRIBUTE] = SYNC_PARTITION
+        pending.append(item)
+        if len(pending) >= args.flush_size:
+            flush()
+    flush()
+
+    if args.delete_missing:
+        # A partial input would tombstone most of the catalog, so refuse if anything was skipped
+        if counts['invalid']:
+            print("Not deleting missing activities because some input was invalid", file=sys.stderr)
+        else:
+            for activity_id, stored_hash in existing.items():
+                if activity_id in seen or stored_hash is None:
+                    continue
+                pending.append({'id': activity_id, 'updated_at': timestamp(), 'deleted': True,
+                                SYNC_PARTITION_ATTRIBUTE: SYNC_PARTITION})
+                if len(pending) >= args.flush_size:
+                    flush('deleted')
+            flush('deleted')
+    write_seconds = time.perf_counter() - write_start
+
+    action = "Would write" if args.dry_run else "Wrote"
+    print(f"Read {counts['read']} activities: {counts['unchanged']} unchanged, {counts['invalid']} invalid, "
+          f"{counts['duplicate']} duplicate")
+    if args.delete_missing:
+        print(f"{action} {counts['deleted']} tombstones for activities missing from the input")
+    print(f"{action} {counts['written']} activities in {write_seconds:.2f}s "
+          f"({counts['written'] / write_seconds if write_seconds else 0:.0f}/s), {capacity_units:.0f} write capacity units")
+    if not args.force:
+        print(f"Read {len(existing)} stored content hashes in {diff_seconds:.2f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Serve the API from a standalone multi-threaded HTTP server instead of API Gateway and Lambda.
+
+Each HTTP request is turned into the API Gateway proxy event that lambda_handler expects and
+dispatched to the unchanged router on a bounded pool of worker threads. All workers share the
+handler's module-level catalog cache, whose single-flight loading means concurrent misses cause
+one table scan. SIGHUP reloads the catalog in the background while the old one keeps serving;
+SIGTERM / SIGINT stop accepting connections and let in-flight requests finish.
+
+A keep-alive connection holds its worker until the client closes it or it has been idle for
+KEEP_ALIVE_TIMEOUT seconds, so at most --workers clients are served at once. The server only
+accepts a connection once a worker is free, so further connections wait in the listen backlog
+(LISTEN_BACKLOG) rather than in an unbounded queue. Size --workers to the expected number of
+concurrent clients, or put a connection-pooling proxy in front when there are more.
+
+With --fake the server runs against the in-memory DynamoDB stand-in from bench/, seeded with a
+synthetic catalog, so the real code path can be load tested without AWS.
+
+Usage: python scripts/serve.py --table ImprovIndex-Activities-int [--port 8080] [--workers 32]
+       python scripts/serve.py --fake 10k
+"""
+import argparse
+import base64
+import importlib
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+BENCH_DIR = os.path.join(os.path.dirname(__file__), '..', 'bench')
+sys.path.insert(0, SRC_DIR)
+
+logger = logging.getLogger('serve')
+
+# Resource paths routed by lambda_handler, as declared by the Api events in template.yaml.
+# Literal segments take precedence over {parameters}, as in API Gateway.
+RESOURCES = (
+    '/activities',
+    '/activities/search',
+    '/activities/{id}',
+    '/activities/{id}/family',
+    '/activities/{id}/similar',
+    '/plans',
+)
+
+# Seconds an idle keep-alive connection may hold a worker before it is closed
+KEEP_ALIVE_TIMEOUT = 5
+
+# Connections the kernel queues while every worker is busy
+LISTEN_BACKLOG = 128
+
+def _compile_resource(resource: str) -> Tuple[int, 're.Pattern']:
+    literal_segments = sum(1 for segment in resource.split('/') if segment and not segment.startswith('{'))
+    pattern = re.sub(r'\\\{(\w+)\\\}', r'(?P<\1>[^/]+)', re.escape(resource))
+    return literal_segments, re.compile(f"^{pattern}/?$")
+
+# Most specific (most literal segments) first
+_ROUTES = sorted(((resource, *_compile_resource(resource)) for resource in RESOURCES), key=lambda route: -route[1])
+
+def match_resource(path: str) -> Tuple[str, Optional[Dict[str, str]]]:
+    """
+    Resource template and path parameters for a request path ('' and None when nothing matches).
+    """
+    for resource, _, pattern in _ROUTES:
+        match = pattern.match(path)
+        if match:
+            return resource, {name: unquote(value) for name, value in match.groupdict().items()} or None
+    return '', None
+
+def build_event(method: str, target: str, headers: Dict[str, str], body: Optional[bytes], client_ip: str) -> Dict[str, Any]:
+    """
+    API Gateway REST proxy event for an HTTP request, as read by lib.http.get_endpoint_variables.
+
+    Args:
+        method (str): HTTP method
+        target (str): Request target (path and query string)
+        headers (dict): Request headers
+        body (bytes, optional): Request body
+        client_ip (str): Address of the client
+
+    Returns:
+        dict: The proxy integration event
+    """
+    url = urlsplit(target)
+    path = url.path or '/'
+    resource, path_params = match_resource(path)
+
+    query: Dict[str, List[str]] = {}
+    for name, value in parse_qsl(url.query, keep_blank_values=True):
+        query.setdefault(name, []).append(value)
+
+    is_base64 = False
+    decoded_body = None
+    if body:
+        try:
+            decoded_body = body.decode('utf-8')
+        except UnicodeDecodeError:
+            decoded_body, is_base64 = base64.b64encode(body).decode('ascii'), True
+
+    return {
+        'resource': resource,
+        'path': path,
+        'httpMethod': method,
+        'headers': headers,
+        'multiValueHeaders': {name: [value] for name, value in headers.items()},
+        # Like API Gateway, the single-value map keeps the last of repeated parameters
+        'queryStringParameters': {name: values[-1] for name, values in query.items()} or None,
+        'multiValueQueryStringParameters': query or None,
+        'pathParameters': path_params,
+        'stageVariables': None,
+        'requestContext': {
+            'resourcePath': resource,
+            'httpMethod': method,
+            'path': path,
+            'stage': 'local',
+            'requestId': str(uuid.uuid4()),
+            'requestTimeEpoch': int(time.time() * 1000),
+            'identity': {'sourceIp': client_ip}
+        },
+        'body': decoded_body,
+        'isBase64Encoded': is_base64
+    }
+
+def invocation_context(event: Dict[str, Any], timeout: float) -> SimpleNamespace:
+    """
+    Minimal stand-in for the Lambda context object.
+    """
+    deadline = time.monotonic() + timeout
+    return SimpleNamespace(
+        aws_request_id=event['requestContext']['requestId'],
+        function_name='improv-index-local',
+        get_remaining_time_in_millis=lambda: max(0, int((deadline - time.monotonic()) * 1000))
+    )
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTP server that handles each connection on a bounded thread pool instead of a thread per connection.
+    A connection is only accepted once a worker slot is free, so the pool never queues work.
+    """
+    request_queue_size = LISTEN_BACKLOG
+
+    def __init__(self, address: Tuple[str, int], handler_class: type, workers: int):
+        super().__init__(address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='worker')
+        self.slots = threading.BoundedSemaphore(workers)
+
+    def get_request(self) -> Tuple[Any, Any]:
+        # Give up after a poll interval so serve_forever() still notices shutdown() while all workers are busy;
+        # the OSError is swallowed by the accept loop and the connection stays in the backlog
+        if not self.slots.acquire(timeout=0.5):
+            raise OSError("No free worker")
+        try:
+            return super().get_request()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def shutdown_request(self, request: Any) -> None:
+        # Called exactly once for every accepted connection, whether it was served, rejected or failed
+        try:
+            super().shutdown_request(request)
+        finally:
+            self.slots.release()
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def drain(self) -> None:
+        """
+        Wait for the requests already accepted to finish, then close the listening socket.
+        """
+        self.executor.shutdown(wait=True)
+        self.server_close()
+
+def make_request_handler(lambda_handler: Any, timeout: float) -> type:
+    class RequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        server_version = 'ImprovIndex'
+        # Headers and body are written separately; with Nagle on, keep-alive clients wait out delayed ACKs
+        disable_nagle_algorithm = True
+
+        def setup(self) -> None:
+            super().setup()
+            self.connection.settimeout(KEEP_ALIVE_TIMEOUT)
+
+        def do_GET(self) -> None:
+            self.dispatch()
+
+        def do_OPTIONS(self) -> None:
+            self.dispatch()
+
+        def do_HEAD(self) -> None:
+            self.dispatch(send_body=False)
+
+        def dispatch(self, send_body: bool = True) -> None:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else None
+            method = 'GET' if self.command == 'HEAD' else self.command
+            event = build_event(method, self.path, dict(self.headers.items()), body, self.client_address[0])
+            response = lambda_handler(event, invocation_context(event, timeout))
+
+            payload = response.get('body') or ''
+            payload = base64.b64decode(payload) if response.get('isBase64Encoded') else payload.encode('utf-8')
+            self.send_response(response.get('statusCode', 200))
+            for name, value in (response.get('headers') or {}).items():
+                self.send_header(name, str(value))
+            for name, values in (response.get('multiValueHeaders') or {}).items():
+                for value in values:
+                    self.send_header(name, str(value))
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug(f"{self.client_address[0]} {format % args}")
+
+    return RequestHandler
+
+def use_fake_table(table_name: str, size: str, seed: int) -> None:
+    """
+    Route DynamoDB calls to the in-memory stand-in, seeded with a synthetic catalog.
+    """
+    sys.path.insert(0, BENCH_DIR)
+    from catalog_gen import SIZES, generate_items
+    from fake_dynamo import FakeDynamoDB
+    from lib.aws import register_override
+    from lib.catalog import UPDATED_AT_INDEX, SYNC_PARTITION_ATTRIBUTE
+
+    database = FakeDynamoDB(seed=seed)
+    table = database.create_table(table_name, indexes={UPDATED_AT_INDEX: (SYNC_PARTITION_ATTRIBUTE, 'updated_at')})
+    table.load(generate_items(SIZES.get(size) or int(size), seed))
+    register_override('dynamodb', database)
+    logger.info(f"Serving {len(table)} synthetic activities from an in-memory table")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--table', help="DynamoDB activities table name (default: $ACTIVITIES_TABLE)")
+    parser.add_argument('--fake', metavar='SIZE', help="Serve a synthetic catalog (1k, 10k, 100k or a count) from an in-memory table")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the --fake catalog")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=32, help="Connections served concurrently (each keep-alive client holds one)")
+    parser.add_argument('--timeout', type=float, default=60, help="Seconds reported as the invocation timeout")
+    parser.add_argument('--no-preload', action='store_true', help="Load the catalog on the first request instead of at startup")
+    parser.add_argument('--metrics', action='store_true', help="Print the CloudWatch EMF line of every sampled request")
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s %(levelname)s %(threadName)s %(name)s: %(message)s')
+    # The handler sets the root logger level from LOG_LEVEL when imported
+    os.environ['LOG_LEVEL'] = args.log_level.upper()
+
+    table_name = args.table or os.environ.get('ACTIVITIES_TABLE') or ('ImprovIndex-Activities-local' if args.fake else None)
+    if not table_name:
+        parser.error("--table (or ACTIVITIES_TABLE) is required unless --fake is used")
+    os.environ['ACTIVITIES_TABLE'] = table_name
+    if args.fake:
+        # A shipped snapshot would not match the synthetic catalog
+        os.environ['SNAPSHOT_PATH'] = ''
+        use_fake_table(table_name, args.fake, args.seed)
+
+    from lib import metrics
+    if not args.metrics:
+        metrics.set_output(open(os.devnull, 'w'))
+    handler = importlib.import_module('lambda.handler')
+
+    if not args.no_preload:
+        start = time.perf_counter()
+        catalog = handler.activity_cache.get()
+        logger.warning(f"Loaded {len(catalog)} activities in {time.perf_counter() - start:.2f}s")
+
+    server = PooledHTTPServer((args.host, args.port), make_request_handler(handler.lambda_handler, args.timeout), args.workers)
+
+    def reload(signum: int, frame: Any) -> None:
+        def run():
+            try:
+                start = time.perf_counter()
+                catalog = handler.activity_cache.refresh()
+                logger.warning(f"Reloaded {len(catalog)} activities in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                logger.error(f"Catalog reload failed, still serving the previous catalog: {str(e)}", exc_info=True)
+        threading.Thread(target=run, name='reload', daemon=True).start()
+
+    def stop(signum: int, frame: Any) -> None:
+        logger.warning(f"Received signal {signum}, shutting down after in-flight requests")
+        # shutdown() waits for serve_forever() to return, so it cannot run on the thread serving
+        threading.Thread(target=server.shutdown, name='shutdown', daemon=True).start()
+
+    signal.signal(signal.SIGHUP, reload)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.warning(f"Listening on http://{args.host}:{server.server_port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    finally:
+        server.drain()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
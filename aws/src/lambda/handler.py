@@ -2,30 +2,153 @@ import json
 import logging
 import os
 import sys
-from typing import Dict, Any
+import threading
+from bisect import bisect_right
+from typing import Dict, Any, List, Optional, Tuple
 
 # Add the src directory to the path so we can import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from lib import metrics
 from lib.http import (
-    get_endpoint_variables, response_success, response_failed, response_error
+    get_endpoint_variables, response_success, response_failed, response_not_found, response_error,
+    put_compressed
 )
+from lib.cache import CatalogCache
+from lib.catalog import Catalog, is_tombstone, parse_updated_at, UPDATED_AT_INDEX, SYNC_PARTITION_ATTRIBUTE, SYNC_PARTITION
+from lib.cursor import encode_cursor, decode_cursor
+from lib.fields import parse_fields, project_activity
+from lib.filter_index import FilterIndex
+from lib.fragments import FragmentCache
+from lib.planner import PlanRequest
+from lib.search import SearchIndex
+from lib.similarity import MAX_NEIGHBOURS
+from lib.snapshot import load_snapshot
+from model.ImprovActivity import ImprovActivity
 
-# Configure logging
+# Configure logging (set LOG_LEVEL=DEBUG to also log every request payload)
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# Page sizes for GET /activities?limit=&cursor=
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Result counts for GET /activities/search
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Generations followed up and down for GET /activities/{id}/family?depth=
+DEFAULT_FAMILY_DEPTH = 3
+MAX_FAMILY_DEPTH = 20
+
+# Neighbours returned by GET /activities/{id}/similar?k=
+DEFAULT_SIMILAR = 10
+
+# Plans returned by GET /plans?count=
+MAX_PLANS = 10
+
+# Parallel scan segments used when (re)loading the full catalog
+SCAN_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', '4'))
+
+# Catalog snapshot shipped with the function code (built by scripts/build_snapshot.py); empty disables it
+SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH', os.path.join(os.path.dirname(__file__), '..', 'snapshot', 'catalog.snap'))
+
+def load_activities():
+    """
+    Load every activity from DynamoDB (cache loader for the activity catalog)
+    """
+    from lib.dynamo import get_table, parallel_scan
+
+    # Get table name from environment
+    table_name = os.environ.get('ACTIVITIES_TABLE')
+    if not table_name:
+        raise ValueError("ACTIVITIES_TABLE environment variable not set")
+
+    # Get table and scan for all activities
+    table = get_table(table_name)
+    activities = parallel_scan(table, segments=SCAN_SEGMENTS)
+
+    logger.info(f"Retrieved {len(activities)} activities from DynamoDB")
+    return Catalog.from_items(activities, fragment_cache, search_index)
+
+# Per-activity JSON, reused across catalog reloads for activities that did not change
+fragment_cache = FragmentCache()
+
+# Full-text index, updated incrementally as activities change between catalog reloads
+search_index = SearchIndex()
+
+# Activity catalog cache, shared across warm invocations of this container
+activity_cache = CatalogCache(
+    loader=load_activities,
+    ttl=float(os.environ.get('CATALOG_CACHE_TTL', '300')),
+    max_stale=float(os.environ.get('CATALOG_CACHE_MAX_STALE', '0')),
+    name="activities"
+)
+
+def restore_snapshot(path: str) -> None:
+    """
+    Serve the catalog from a shipped snapshot, then reconcile newer activities from DynamoDB in the background
+    """
+    global search_index
+
+    snapshot = load_snapshot(path)
+    catalog = snapshot.catalog(fragment_cache)
+    search_index = catalog.search_index
+    for encoding in snapshot.encodings:
+        put_compressed(catalog.etag(), encoding, snapshot.body(encoding))
+    activity_cache.put(catalog)
+
+    threading.Thread(target=reconcile_snapshot, args=(catalog,), name="snapshot-reconcile", daemon=True).start()
+
+
+def reconcile_snapshot(catalog: Catalog) -> None:
+    """
+    Fetch activities updated (or deleted) after the snapshot was built and merge them into the cached catalog
+    """
+    try:
+        from lib.dynamo import get_table
+
+        items = query_changes(get_table(os.environ.get('ACTIVITIES_TABLE')), catalog.watermark)
+        logger.info(f"Snapshot reconcile found {len(items)} activities changed after {catalog.watermark!r}")
+        # Only apply if the cache still holds the snapshot (a full reload may already have replaced it)
+        if items and activity_cache.peek() is catalog:
+            activity_cache.put(catalog.apply_changes(items))
+    except Exception as e:
+        logger.error(f"Error reconciling catalog snapshot: {str(e)}", exc_info=True)
+
+
+if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+    try:
+        restore_snapshot(SNAPSHOT_PATH)
+    except Exception as e:
+        logger.error(f"Failed to load catalog snapshot {SNAPSHOT_PATH}: {str(e)}", exc_info=True)
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Main Lambda handler for Improv Index API
-    Currently supports: GET /activities
+    Currently supports: GET /activities, GET /activities/search, GET /activities/{id}, GET /activities/{id}/family,
+    GET /activities/{id}/similar, GET /plans
+    Emits one CloudWatch Embedded Metric Format line per sampled request (see lib/metrics.py)
+    """
+    with metrics.request(context) as request_metrics:
+        response = route_request(event, context)
+        request_metrics.finish(response)
+    return response
+
+
+def route_request(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Dispatch a request to the handler for its method and resource path
     """
     try:
-        # Log the incoming request for debugging
-        logger.info(f"Received event: {json.dumps(event, default=str)}")
+        # Serializing the whole event is costly, so only do it when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Received event: {json.dumps(event, default=str)}")
 
         # Extract request details
-        endpoint = get_endpoint_variables(event)
+        with metrics.phase('routing'):
+            endpoint = get_endpoint_variables(event)
         logger.info(f"Processing {endpoint['method']} {endpoint['path']}")
         
         # Handle CORS preflight requests
@@ -33,11 +156,28 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             return response_success(message="CORS preflight")
         
         # Route to appropriate handler based on method and path
+        metrics.set_dimension('Route', f"{endpoint['method']} {endpoint['path']}")
         if endpoint['path'] == '/activities' and endpoint['method'] == 'GET':
             return handle_get_activities(event, context)
         
+        elif endpoint['path'] == '/activities/search' and endpoint['method'] == 'GET':
+            return handle_search_activities(event, context)
+        
+        elif endpoint['path'] == '/activities/{id}' and endpoint['method'] == 'GET':
+            return handle_get_activity(event, context)
+
+        elif endpoint['path'] == '/activities/{id}/family' and endpoint['method'] == 'GET':
+            return handle_get_activity_family(event, context)
+
+        elif endpoint['path'] == '/activities/{id}/similar' and endpoint['method'] == 'GET':
+            return handle_get_similar_activities(event, context)
+
+        elif endpoint['path'] == '/plans' and endpoint['method'] == 'GET':
+            return handle_get_plans(event, context)
+        
         else:
             logger.warning(f"No handler found for {endpoint['method']} {endpoint['path']}")
+            metrics.set_dimension('Route', 'unmatched')
             return response_failed(f"Endpoint not found: {endpoint['method']} {endpoint['path']}")
     
     except Exception as e:
@@ -48,25 +188,518 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 def handle_get_activities(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Handle GET /activities - Returns all improv activities
+    Optional filters: ?tags=&skills=&level=&type=&field=&complexity=&skill_ceiling=&physicality=&vocality=
+    (comma separated values are OR'd, filters are AND'd); ?facets=true adds per-value counts
+    Optional pagination: ?limit=&cursor= (cursor is returned with each page until the last one)
+    Optional lookup: ?ids=a,b,c returns just those activities, in the requested order
+    Optional delta sync: ?since=<updated_at watermark> returns only activities changed after it,
+    the ids deleted after it and the new watermark to pass next time, oldest first in pages of ?limit=
+    (default and at most MAX_PAGE_SIZE) with a cursor until the last one
+    Optional sparse fieldsets: ?fields=name,brief,requirements.players or ?view=card|full
     """
     try:
-        from lib.dynamo import get_table, scan_table
-        
-        # Get table name from environment
-        table_name = os.environ.get('ACTIVITIES_TABLE')
-        if not table_name:
+        if not os.environ.get('ACTIVITIES_TABLE'):
             logger.error("ACTIVITIES_TABLE environment variable not set")
             return response_error("Configuration error")
-        
-        # Get table and scan for all activities
-        table = get_table(table_name)
-        activities = scan_table(table)
-        
-        logger.info(f"Retrieved {len(activities)} activities from DynamoDB")
-        
-        return response_success(data=activities, message="Activities retrieved successfully")
+
+        query_params = get_endpoint_variables(event)['query_params']
+        try:
+            fields = parse_fields(query_params)
+            filters = FilterIndex.parse_filters(query_params)
+            page = parse_page_params(query_params)
+        except ValueError as e:
+            return response_failed(message=str(e))
+
+        if query_params.get('ids'):
+            return handle_get_activities_by_id(event, query_params['ids'], fields)
+
+        if query_params.get('since') is not None:
+            return handle_get_activities_since(event, query_params['since'], page, fields)
+
+        # Without a resident catalog, unfiltered pages stream straight from DynamoDB so memory stays bounded.
+        # Each source orders activities differently, so a cursor keeps paging the source that issued it.
+        if page is not None and not filters:
+            limit, cursor = page
+            if cursor is None and activity_cache.peek() is None:
+                return handle_get_activities_page_from_table(event, limit, None, fields)
+            if cursor is not None and cursor.get('source') == 'table':
+                return handle_get_activities_page_from_table(event, limit, cursor.get('key'), fields)
+
+        catalog = activity_cache.get()
+        logger.debug(f"Serving {len(catalog)} activities (cache: {activity_cache.stats()})")
+
+        etag = catalog_etag(catalog, event)
+        if not filters and page is None and fields is None and query_params.get('facets') != 'true':
+            metrics.put('Items', len(catalog))
+            return response_success(
+                data=catalog.fragments,
+                message="Activities retrieved successfully",
+                event=event,
+                etag=etag
+            )
+
+        body: Dict[str, Any] = {}
+        if filters:
+            mask = catalog.filter_index.match(filters)
+            positions = catalog.filter_index.positions(mask)
+            body["facets"] = catalog.filter_index.facets(mask)
+        else:
+            positions = range(len(catalog))
+            if query_params.get('facets') == 'true':
+                body["facets"] = catalog.filter_index.facets(catalog.filter_index.all)
+        body["count"] = len(positions)
+
+        if page is not None:
+            limit, cursor = page
+            start = 0
+            if cursor is not None:
+                start_position = catalog.position_of(cursor.get('id')) if cursor.get('source') == 'catalog' else None
+                if start_position is None:
+                    return response_failed(message="Cursor is no longer valid, restart pagination")
+                start = bisect_right(positions, start_position)
+            positions = positions[start:start + limit]
+            more = start + limit < body["count"]
+            body["cursor"] = encode_cursor({'source': 'catalog', 'id': catalog.items[positions[-1]].id}) if more and positions else None
+
+        body["data"] = [encode_activity(catalog, position, fields) for position in positions]
+        metrics.put('Items', len(body["data"]))
+        return response_success(
+            data=body,
+            message="Activities retrieved successfully",
+            event=event,
+            etag=etag
+        )
     
     except Exception as e:
         logger.error(f"Error in handle_get_activities: {str(e)}", exc_info=True)
         return response_error("Failed to retrieve activities")
 
+
+def handle_get_activities_by_id(event: Dict[str, Any], raw_ids: str, fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Serve GET /activities?ids= from the resident catalog, or with a batch key read
+    """
+    ids = [activity_id.strip() for activity_id in raw_ids.split(',') if activity_id.strip()]
+    if len(ids) > MAX_PAGE_SIZE:
+        return response_failed(message=f"At most {MAX_PAGE_SIZE} ids may be requested at once")
+
+    catalog = resident_catalog()
+    if catalog is not None:
+        positions = (catalog.position_of(activity_id) for activity_id in dict.fromkeys(ids))
+        activities = [encode_activity(catalog, position, fields) for position in positions if position is not None]
+    else:
+        from lib.dynamo import get_table, batch_get_items
+        table = get_table(os.environ.get('ACTIVITIES_TABLE'))
+        projection = table_projection(fields)
+        items = batch_get_items(table, [{'id': activity_id} for activity_id in ids], **projection)
+        activities = [encode_item(item, fields) for item in items if not is_tombstone(item)]
+
+    metrics.put('Items', len(activities))
+    return response_success(
+        data={
+            "data": activities,
+            "count": len(activities)
+        },
+        message="Activities retrieved successfully",
+        event=event
+    )
+
+
+def handle_get_activities_since(event: Dict[str, Any], since: str, page: Optional[Tuple[int, Optional[Dict[str, Any]]]],
+                                fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Serve GET /activities?since= with a query on the updated_at index, so it reads only the changed activities.
+    Changes come back oldest first in pages of ?limit= (default MAX_PAGE_SIZE); follow the cursor to the
+    last page before moving on to the returned watermark.
+    """
+    try:
+        since = parse_updated_at(since)
+    except ValueError:
+        return response_failed(message="since must be an ISO 8601 timestamp, e.g. 2025-01-31T12:00:00Z")
+    limit, cursor = page if page is not None else (MAX_PAGE_SIZE, None)
+    if cursor is not None and (cursor.get('source') != 'changes' or cursor.get('since') != since):
+        return response_failed(message="Cursor is no longer valid, restart pagination")
+
+    from lib.dynamo import get_table, query_page
+    table = get_table(os.environ.get('ACTIVITIES_TABLE'))
+    projection = table_projection(fields)
+    items, last_key = query_page(table, changes_condition(since), limit, cursor and cursor.get('key'),
+                                 IndexName=UPDATED_AT_INDEX, **projection)
+
+    activities = [encode_item(item, fields) for item in items if not is_tombstone(item)]
+    deleted = [item['id'] for item in items if is_tombstone(item)]
+    metrics.put('Items', len(items))
+    return response_success(
+        data={
+            "data": activities,
+            "deleted": deleted,
+            "count": len(activities),
+            "watermark": max((item['updated_at'] for item in items), default=since),
+            "cursor": encode_cursor({'source': 'changes', 'since': since, 'key': last_key}) if last_key else None
+        },
+        message="Activities retrieved successfully",
+        event=event
+    )
+
+
+def changes_condition(since: str) -> Any:
+    """
+    Key condition on the updated_at index for activities and tombstones updated after `since`
+    """
+    from boto3.dynamodb.conditions import Key
+
+    return Key(SYNC_PARTITION_ATTRIBUTE).eq(SYNC_PARTITION) & Key('updated_at').gt(since)
+
+
+def query_changes(table, since: str, **kwargs) -> List[Dict[str, Any]]:
+    """
+    All activities and tombstones with updated_at after `since`, oldest first, from the updated_at index
+    """
+    from lib.dynamo import query_table
+
+    return query_table(table, changes_condition(since), IndexName=UPDATED_AT_INDEX, **kwargs)
+
+
+def handle_get_activity(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Handle GET /activities/{id} - Returns a single improv activity
+    """
+    try:
+        if not os.environ.get('ACTIVITIES_TABLE'):
+            logger.error("ACTIVITIES_TABLE environment variable not set")
+            return response_error("Configuration error")
+
+        endpoint = get_endpoint_variables(event)
+        activity_id = endpoint['path_params'].get('id')
+        if not activity_id:
+            return response_failed(message="Missing activity id")
+        try:
+            fields = parse_fields(endpoint['query_params'])
+        except ValueError as e:
+            return response_failed(message=str(e))
+
+        catalog = resident_catalog()
+        if catalog is not None:
+            position = catalog.position_of(activity_id)
+            activity = encode_activity(catalog, position, fields) if position is not None else None
+        else:
+            from lib.dynamo import get_table, get_item
+            projection = table_projection(fields)
+            item = get_item(get_table(os.environ.get('ACTIVITIES_TABLE')), {'id': activity_id}, **projection)
+            activity = encode_item(item, fields) if item and not is_tombstone(item) else None
+
+        if activity is None:
+            return response_not_found(message=f"Activity not found: {activity_id}")
+
+        metrics.put('Items', 1)
+        return response_success(data={"data": activity}, message="Activity retrieved successfully", event=event)
+    
+    except Exception as e:
+        logger.error(f"Error in handle_get_activity: {str(e)}", exc_info=True)
+        return response_error("Failed to retrieve activity")
+
+
+def handle_get_activity_family(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Handle GET /activities/{id}/family - Returns an activity with its ancestors, descendants and siblings
+    Optional: ?depth= generations to follow up and down (default 3), ?fields= / ?view= as for GET /activities
+    Reference problems among the returned activities are listed under "cyclic" and "dangling"
+    """
+    try:
+        if not os.environ.get('ACTIVITIES_TABLE'):
+            logger.error("ACTIVITIES_TABLE environment variable not set")
+            return response_error("Configuration error")
+
+        endpoint = get_endpoint_variables(event)
+        activity_id = endpoint['path_params'].get('id')
+        if not activity_id:
+            return response_failed(message="Missing activity id")
+        query_params = endpoint['query_params']
+        try:
+            fields = parse_fields(query_params)
+        except ValueError as e:
+            return response_failed(message=str(e))
+        try:
+            depth = min(int(query_params.get('depth', DEFAULT_FAMILY_DEPTH)), MAX_FAMILY_DEPTH)
+        except ValueError:
+            return response_failed(message="depth must be an integer")
+        if depth < 1:
+            return response_failed(message="depth must be at least 1")
+
+        catalog = activity_cache.get()
+        position = catalog.position_of(activity_id)
+        if position is None:
+            return response_not_found(message=f"Activity not found: {activity_id}")
+
+        family = catalog.family_index.family(position, depth)
+        body: Dict[str, Any] = {"data": encode_activity(catalog, position, fields)}
+        for relation in ('ancestors', 'descendants', 'siblings'):
+            body[relation] = [encode_activity(catalog, member, fields) for member in family[relation]]
+        body["cyclic"] = family['cyclic']
+        body["dangling"] = family['dangling']
+
+        metrics.put('Items', 1 + len(family['ancestors']) + len(family['descendants']) + len(family['siblings']))
+        return response_success(
+            data=body,
+            message="Activity family retrieved successfully",
+            event=event,
+            etag=catalog_etag(catalog, event)
+        )
+
+    except Exception as e:
+        logger.error(f"Error in handle_get_activity_family: {str(e)}", exc_info=True)
+        return response_error("Failed to retrieve activity family")
+
+
+def handle_get_similar_activities(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Handle GET /activities/{id}/similar - Returns the activities most like one (cosine similarity of their features)
+    Optional: ?k= (default 10), ?fields= / ?view= as for GET /activities
+    """
+    try:
+        if not os.environ.get('ACTIVITIES_TABLE'):
+            logger.error("ACTIVITIES_TABLE environment variable not set")
+            return response_error("Configuration error")
+
+        endpoint = get_endpoint_variables(event)
+        activity_id = endpoint['path_params'].get('id')
+        if not activity_id:
+            return response_failed(message="Missing activity id")
+        query_params = endpoint['query_params']
+        try:
+            fields = parse_fields(query_params)
+        except ValueError as e:
+            return response_failed(message=str(e))
+        try:
+            k = min(int(query_params.get('k', DEFAULT_SIMILAR)), MAX_NEIGHBOURS)
+        except ValueError:
+            return response_failed(message="k must be an integer")
+        if k < 1:
+            return response_failed(message="k must be at least 1")
+
+        catalog = activity_cache.get()
+        position = catalog.position_of(activity_id)
+        if position is None:
+            return response_not_found(message=f"Activity not found: {activity_id}")
+
+        neighbours = catalog.similarity_index.similar(position, k)
+        metrics.put('Items', len(neighbours))
+        return response_success(
+            data={
+                "data": [encode_activity(catalog, neighbour, fields) for neighbour, _ in neighbours],
+                "count": len(neighbours),
+                "scores": [round(score, 4) for _, score in neighbours]
+            },
+            message="Similar activities retrieved successfully",
+            event=event,
+            etag=catalog_etag(catalog, event)
+        )
+
+    except Exception as e:
+        logger.error(f"Error in handle_get_similar_activities: {str(e)}", exc_info=True)
+        return response_error("Failed to retrieve similar activities")
+
+
+def handle_get_plans(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Handle GET /plans?players=&minutes= - Returns ranked workshop session plans (warmup, exercises/drills, games)
+    Optional: ?level= (also draws on easier activities), ?skills=a,b to cover, ?seed= to vary equally good plans,
+    ?count= plans (default 3), ?fields= / ?view= as for GET /activities
+    """
+    try:
+        if not os.environ.get('ACTIVITIES_TABLE'):
+            logger.error("ACTIVITIES_TABLE environment variable not set")
+            return response_error("Configuration error")
+
+        query_params = get_endpoint_variables(event)['query_params']
+        try:
+            request = PlanRequest.from_query(query_params, MAX_PLANS)
+            fields = parse_fields(query_params)
+        except ValueError as e:
+            return response_failed(message=str(e))
+
+        catalog = activity_cache.get()
+        plans = catalog.planner_index.plan(request)
+        for plan in plans:
+            for stage in plan['stages']:
+                stage['activities'] = [
+                    {"minutes": minutes, "activity": encode_activity(catalog, position, fields)}
+                    for position, minutes in stage['activities']
+                ]
+
+        metrics.put('Items', sum(len(stage['activities']) for plan in plans for stage in plan['stages']))
+        return response_success(
+            data={
+                "data": plans,
+                "count": len(plans),
+                "seed": request.seed
+            },
+            message="Plans created successfully",
+            event=event,
+            etag=catalog_etag(catalog, event)
+        )
+
+    except Exception as e:
+        logger.error(f"Error in handle_get_plans: {str(e)}", exc_info=True)
+        return response_error("Failed to create plans")
+
+
+def handle_search_activities(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Handle GET /activities/search?q= - Returns activities ranked by relevance (BM25)
+    Optional: ?limit= (default 20), ?prefix=false to disable type-ahead matching of the last word,
+    ?fields= / ?view= as for GET /activities
+    """
+    try:
+        if not os.environ.get('ACTIVITIES_TABLE'):
+            logger.error("ACTIVITIES_TABLE environment variable not set")
+            return response_error("Configuration error")
+
+        query_params = get_endpoint_variables(event)['query_params']
+        query = (query_params.get('q') or '').strip()
+        if not query:
+            return response_failed(message="Missing search query (q)")
+        try:
+            fields = parse_fields(query_params)
+        except ValueError as e:
+            return response_failed(message=str(e))
+        try:
+            limit = min(int(query_params.get('limit', DEFAULT_SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+        except ValueError:
+            return response_failed(message="limit must be an integer")
+        if limit < 1:
+            return response_failed(message="limit must be at least 1")
+
+        catalog = activity_cache.get()
+        etag = catalog_etag(catalog, event)
+        results = catalog.search_index.search(query, limit=limit, prefix=query_params.get('prefix') != 'false')
+
+        activities = []
+        scores = []
+        for activity_id, score in results:
+            position = catalog.position_of(activity_id)
+            if position is not None:
+                activities.append(encode_activity(catalog, position, fields))
+                scores.append(round(score, 4))
+
+        metrics.put('Items', len(activities))
+        return response_success(
+            data={
+                "data": activities,
+                "count": len(activities),
+                "scores": scores
+            },
+            message="Search completed successfully",
+            event=event,
+            etag=etag
+        )
+    
+    except Exception as e:
+        logger.error(f"Error in handle_search_activities: {str(e)}", exc_info=True)
+        return response_error("Failed to search activities")
+
+
+def handle_get_activities_page_from_table(event: Dict[str, Any], limit: int, start_key: Optional[Dict[str, Any]],
+                                          fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Serve one page of GET /activities directly from a DynamoDB scan
+    """
+    from lib.dynamo import get_table, scan_page
+
+    table = get_table(os.environ.get('ACTIVITIES_TABLE'))
+    projection = table_projection(fields)
+    items, last_key = scan_page(table, limit, start_key, **projection)
+    activities = [encode_item(item, fields) for item in items if not is_tombstone(item)]
+    logger.info(f"Serving page of {len(activities)} activities from DynamoDB")
+    metrics.put('Items', len(activities))
+
+    return response_success(
+        data={
+            "data": activities,
+            "cursor": encode_cursor({'source': 'table', 'key': last_key}) if last_key else None
+        },
+        message="Activities retrieved successfully",
+        event=event
+    )
+
+
+def resident_catalog() -> Optional[Catalog]:
+    """
+    The resident catalog, revalidated like a full read (served stale while a refresh runs, reloaded once
+    past max_stale), or None when no catalog is loaded and lookups should go to DynamoDB instead
+    """
+    if activity_cache.peek() is None:
+        return None
+    return activity_cache.get()
+
+
+def catalog_etag(catalog: Catalog, event: Dict[str, Any]) -> str:
+    """
+    ETag of a response built from the catalog: the catalog version for the full catalog (GET /activities
+    without parameters, whose compressed body a snapshot may prime), otherwise a digest of the version
+    and the route, path and query parameters, so no two routes or requests share a tag or a cached body
+    """
+    endpoint = get_endpoint_variables(event)
+    if endpoint['method'] == 'GET' and endpoint['path'] == '/activities' and not endpoint['query_params']:
+        return catalog.etag()
+    return catalog.etag({
+        'route': f"{endpoint['method']} {endpoint['path']}",
+        'path_params': endpoint['path_params'],
+        'query_params': endpoint['query_params']
+    })
+
+
+def encode_activity(catalog: Catalog, position: int, fields: Optional[List[str]]) -> Any:
+    """
+    Response entry for a catalog activity: its cached JSON fragment, or just the requested fields
+    """
+    if fields is None:
+        return catalog.fragments[position]
+    return project_activity(catalog.items[position], fields)
+
+
+def table_projection(fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Projection kwargs for reading activities from the table. Tombstones only carry id, updated_at and deleted,
+    so those are always read alongside the requested fields; encode_item drops them again.
+    """
+    if not fields:
+        return {}
+    from lib.dynamo import build_projection
+    return build_projection(list(dict.fromkeys(fields + ['id', 'updated_at', 'deleted'])))
+
+
+def encode_item(item: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Response entry for a raw DynamoDB item (possibly already projected to fields)
+    """
+    with metrics.phase('decode'):
+        activity = ImprovActivity.from_item(item)
+    if fields is None:
+        return activity.to_item()
+    return project_activity(activity, fields)
+
+
+def parse_page_params(query_params: Dict[str, str]) -> Optional[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Parse ?limit=&cursor= into (limit, decoded cursor), or None when the request is not paginated.
+    Cursors record the source that issued them: {'source': 'table', 'key': LastEvaluatedKey} for
+    pages scanned from DynamoDB, {'source': 'catalog', 'id': last id} for pages of the resident catalog
+
+    Raises:
+        ValueError: If limit is not a positive integer or the cursor is invalid
+    """
+    raw_limit = query_params.get('limit')
+    cursor = query_params.get('cursor')
+    if raw_limit is None and cursor is None:
+        return None
+    if raw_limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE), decode_cursor(cursor) if cursor else None
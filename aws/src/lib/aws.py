@@ -0,0 +1,94 @@
+import os
+import threading
+from typing import Any, Dict
+
+# Region for every AWS client; Lambda sets AWS_REGION, local runs can override either variable
+REGION = os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION') or "us-east-2"
+
+# Connection and retry settings shared by all clients
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '16'))
+CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '2'))
+READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '5'))
+MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+
+_clients: Dict[str, Any] = {}
+_resource_classes: Dict[str, type] = {}
+_clients_lock = threading.Lock()
+_thread_local = threading.local()
+_config = None
+
+# Stand-ins registered for local runs and benchmarks; they take precedence over real clients and resources
+_overrides: Dict[str, Any] = {}
+
+def client_config():
+    """
+    botocore Config used for every client and resource (pool size, keep-alive, timeouts, adaptive retries).
+    """
+    global _config
+    if _config is None:
+        from botocore.config import Config
+        _config = Config(
+            region_name=REGION,
+            max_pool_connections=MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            connect_timeout=CONNECT_TIMEOUT,
+            read_timeout=READ_TIMEOUT,
+            retries={'max_attempts': MAX_ATTEMPTS, 'mode': 'adaptive'}
+        )
+    return _config
+
+def get_client(service: str) -> Any:
+    """
+    Shared low-level client for a service, created on first use.
+    Clients are thread-safe, so one per service is kept for the life of the container.
+    """
+    client = _overrides.get(service) or _clients.get(service)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(service)
+            if client is None:
+                import boto3
+                client = boto3.session.Session().client(service, config=client_config())
+                _clients[service] = client
+    return client
+
+def get_resource(service: str) -> Any:
+    """
+    Resource for a service, created on first use in the calling thread.
+    boto3 resources are not thread-safe, so each thread gets (and keeps) its own, but they are all
+    built around the shared client: the service model is loaded once and every thread draws on the
+    one connection pool sized by client_config().
+    """
+    override = _overrides.get(service)
+    if override is not None:
+        return override
+    resources = getattr(_thread_local, 'resources', None)
+    if resources is None:
+        resources = _thread_local.resources = {}
+    resource = resources.get(service)
+    if resource is None:
+        resource = _resource_class(service)(client=get_client(service))
+        resources[service] = resource
+    return resource
+
+def _resource_class(service: str) -> type:
+    # The generated resource class is built (with its resource model) once per service
+    resource_class = _resource_classes.get(service)
+    if resource_class is None:
+        with _clients_lock:
+            resource_class = _resource_classes.get(service)
+            if resource_class is None:
+                import boto3
+                resource_class = type(boto3.session.Session().resource(service, config=client_config()))
+                _resource_classes[service] = resource_class
+    return resource_class
+
+def register_override(service: str, stand_in: Any) -> None:
+    """
+    Serve `stand_in` from get_client and get_resource for a service (e.g. an in-memory DynamoDB).
+    The stand-in is shared by every thread, so it must be thread-safe. Pass None to remove it.
+    """
+    if stand_in is None:
+        _overrides.pop(service, None)
+    else:
+        _overrides[service] = stand_in
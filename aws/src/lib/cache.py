@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from lib import metrics
+
+logger = logging.getLogger(__name__)
+
+class CatalogCache:
+    """
+    Process-wide cache for a value that is expensive to load (e.g. a full table scan).
+
+    Lives at module level so it survives across warm Lambda invocations. Entries are
+    fresh for `ttl` seconds; after that, and for up to `max_stale` further seconds, the
+    stale value is served while a single background refresh runs. Past that window the
+    caller blocks on a synchronous reload. Concurrent misses share one load.
+    """
+
+    def __init__(self, loader: Callable[[], Any], ttl: float = 60.0, max_stale: float = 0.0,
+                 name: str = "catalog", clock: Callable[[], float] = time.monotonic):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.name = name
+        self._clock = clock
+
+        self._value: Any = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def get(self) -> Any:
+        """
+        Return the cached value, loading or revalidating it as needed.
+
+        Returns:
+            The cached value
+
+        Raises:
+            Exception: Whatever the loader raises when no usable value is cached
+        """
+        now = self._clock()
+        loaded_at = self._loaded_at
+        if loaded_at is not None:
+            age = now - loaded_at
+            if age < self.ttl:
+                self.hits += 1
+                self._record('hit')
+                return self._value
+            if age < self.ttl + self.max_stale:
+                self.stale_hits += 1
+                self._record('stale')
+                self._refresh_in_background()
+                return self._value
+
+        with self._lock:
+            # Another caller may have finished the load while we waited for the lock
+            if self._loaded_at is not None and self._clock() - self._loaded_at < self.ttl:
+                self.hits += 1
+                self._record('hit')
+                return self._value
+            self.misses += 1
+            self._record('miss')
+            return self._load()
+
+    def peek(self) -> Any:
+        """
+        Return the cached value without loading, or None if nothing has been loaded.
+        """
+        return self._value
+
+    def put(self, value: Any) -> None:
+        """
+        Replace the cached value and reset its age.
+        """
+        with self._lock:
+            self._value = value
+            self._loaded_at = self._clock()
+
+    def refresh(self) -> Any:
+        """
+        Reload the value now. Callers keep being served the current value until the new one is in
+        place, and a reload already in progress is waited for rather than repeated.
+
+        Raises:
+            Exception: Whatever the loader raises (the current value is kept)
+        """
+        loaded_at = self._loaded_at
+        with self._lock:
+            # A reload that held the lock while we waited already replaced the value
+            if self._loaded_at is not None and self._loaded_at != loaded_at:
+                return self._value
+            return self._load()
+
+    def invalidate(self) -> None:
+        """
+        Expire the cached value so the next get() reloads it.
+        """
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss/refresh counters and the age of the cached value.
+        """
+        age = None if self._loaded_at is None else round(self._clock() - self._loaded_at, 3)
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "age": age
+        }
+
+    def _record(self, outcome: str) -> None:
+        # Averaging CacheHit over requests gives the hit rate (stale values count as hits)
+        metrics.set_property(f"{self.name}_cache", outcome)
+        metrics.put('CacheHit', 0 if outcome == 'miss' else 1)
+
+    def _load(self) -> Any:
+        # Caller must hold self._lock
+        value = self.loader()
+        self._value = value
+        self._loaded_at = self._clock()
+        self.refreshes += 1
+        logger.info(f"Loaded {self.name} cache ({self.stats()})")
+        return value
+
+    def _refresh_in_background(self) -> None:
+        if self._refreshing:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        self._refreshing = True
+
+        def run():
+            try:
+                self._load()
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.error(f"Background refresh of {self.name} cache failed: {str(e)}", exc_info=True)
+            finally:
+                self._refreshing = False
+                self._lock.release()
+
+        threading.Thread(target=run, name=f"{self.name}-refresh", daemon=True).start()
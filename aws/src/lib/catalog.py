@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+from lib import metrics
+from lib.family import FamilyIndex
+from lib.filter_index import FilterIndex
+from lib.fragments import FragmentCache
+from lib.planner import PlannerIndex
+from lib.search import SearchIndex
+from lib.similarity import SimilarityIndex
+from model.ImprovActivity import ImprovActivity
+
+logger = logging.getLogger(__name__)
+
+# Every activity carries a constant partition attribute so a GSI on (partition, updated_at) can
+# list the changes since a timestamp without a scan (GET /activities?since=, snapshot reconcile)
+UPDATED_AT_INDEX = os.environ.get('UPDATED_AT_INDEX', 'UpdatedAtIndex')
+SYNC_PARTITION_ATTRIBUTE = 'catalog'
+SYNC_PARTITION = 'activities'
+
+# updated_at is stored in one fixed-width UTC form, because the index compares it as a string
+UPDATED_AT_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+def format_updated_at(moment: datetime) -> str:
+    """
+    Stored updated_at form of a datetime (naive datetimes are taken as UTC).
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.strftime(UPDATED_AT_FORMAT)
+
+def parse_updated_at(value: str) -> str:
+    """
+    Re-format an ISO 8601 date or timestamp (UTC unless it has an offset) into the stored updated_at
+    form, so it compares correctly against stored values (e.g. 2025-01-31T12:00Z -> 2025-01-31T12:00:00.000000Z).
+
+    Raises:
+        ValueError: If the value is not an ISO 8601 date or timestamp
+    """
+    return format_updated_at(datetime.fromisoformat(value.strip()))
+
+def is_tombstone(item: Dict[str, Any]) -> bool:
+    """
+    Whether a raw item marks a deleted activity (kept, with a fresh updated_at, so delta syncs see the deletion).
+    """
+    return bool(item.get('deleted'))
+
+def decode_items(items: List[Dict[str, Any]]) -> List[ImprovActivity]:
+    """
+    Decode raw DynamoDB items, skipping tombstones and (with a log line) invalid items.
+    """
+    activities = []
+    with metrics.phase('decode'):
+        for item in items:
+            if is_tombstone(item):
+                continue
+            try:
+                activities.append(ImprovActivity.from_item(item))
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.error(f"Skipping invalid activity {item.get('id')!r}: {str(e)}")
+    return activities
+
+class Catalog:
+    """
+    Immutable snapshot of the activity table as loaded into memory.
+
+    `version` identifies the catalog contents (ids and their `updated_at`), so it changes
+    whenever an activity is added, edited or removed and can back a strong ETag.
+    """
+
+    def __init__(self, items: List[ImprovActivity], fragment_cache: Optional[FragmentCache] = None,
+                 search_index: Optional[SearchIndex] = None, filter_index: Optional[FilterIndex] = None,
+                 similarity_index: Optional[SimilarityIndex] = None):
+        self.items = items
+        self.version = self._compute_version(items)
+        self._fragment_cache = fragment_cache or FragmentCache()
+        # Pre-encoded JSON aligned with items, so responses are assembled without re-encoding
+        with metrics.phase('serialize'):
+            self.fragments = self._fragment_cache.sync(items)
+        self._search_index = search_index
+        self._filter_index = filter_index
+        self._similarity_index = similarity_index
+
+    @classmethod
+    def from_items(cls, items: List[Dict[str, Any]], fragment_cache: Optional[FragmentCache] = None,
+                   search_index: Optional[SearchIndex] = None) -> 'Catalog':
+        """
+        Decode raw DynamoDB items into a catalog, skipping (and logging) invalid ones.
+        """
+        return cls(decode_items(items), fragment_cache, search_index)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @cached_property
+    def positions_by_id(self) -> Dict[str, int]:
+        return {activity.id: position for position, activity in enumerate(self.items)}
+
+    def position_of(self, activity_id: Any) -> Optional[int]:
+        """
+        Position of an activity in the catalog (scan order), or None if it is not present.
+        """
+        return self.positions_by_id.get(activity_id)
+
+    @property
+    def filter_index(self) -> FilterIndex:
+        """
+        Bitmap index over the enum fields of the catalog, built on first use.
+        """
+        if self._filter_index is None:
+            with metrics.phase('index'):
+                self._filter_index = FilterIndex(self.items)
+        return self._filter_index
+
+    @property
+    def similarity_index(self) -> SimilarityIndex:
+        """
+        Nearest-neighbour index of the catalog (its feature matrix is only built when a lookup needs it).
+        """
+        if self._similarity_index is None:
+            self._similarity_index = SimilarityIndex(self.items)
+        return self._similarity_index
+
+    @cached_property
+    def family_index(self) -> FamilyIndex:
+        """
+        Parent/variant adjacency index of the catalog, built on first use.
+        """
+        with metrics.phase('index'):
+            return FamilyIndex(self.items)
+
+    @cached_property
+    def planner_index(self) -> PlannerIndex:
+        """
+        Requirement interval indexes used to build session plans, built on first use.
+        """
+        filter_index = self.filter_index
+        with metrics.phase('index'):
+            return PlannerIndex(self.items, filter_index)
+
+    @cached_property
+    def watermark(self) -> str:
+        """
+        Newest `updated_at` in the catalog ("" when empty).
+        """
+        return max((activity.updated_at for activity in self.items), default="")
+
+    def apply_changes(self, items: List[Dict[str, Any]], deleted_ids: Optional[List[str]] = None) -> 'Catalog':
+        """
+        New catalog with changed raw items replaced (or appended, if new) and deleted ids
+        (or tombstoned items) removed. Fragments and the search index are shared, so only the
+        changed activities are re-encoded.
+        """
+        changed = decode_items(items)
+        changed_by_id = {activity.id: activity for activity in changed}
+        removed = set(deleted_ids or ()) | {item.get('id') for item in items if is_tombstone(item)}
+        activities = []
+        for activity in self.items:
+            if activity.id in removed:
+                continue
+            activities.append(changed_by_id.pop(activity.id, activity))
+        activities.extend(activity for activity in changed if activity.id in changed_by_id)
+        # Hand on the index this catalog synced, if any, so the new one only re-indexes the changes
+        search_index = self.__dict__.get('search_index', self._search_index)
+        return Catalog(activities, self._fragment_cache, search_index)
+
+    @cached_property
+    def search_index(self) -> SearchIndex:
+        """
+        Full-text index of the catalog, synced on first use (incrementally when it is shared across reloads).
+        """
+        with metrics.phase('index'):
+            # An empty SearchIndex is falsy (it has a length), so test for None: the shared index starts empty
+            search_index = self._search_index if self._search_index is not None else SearchIndex()
+            return search_index.sync(self.items, self.version)
+
+    def etag(self, variant: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Strong ETag for a response derived from this catalog.
+
+        Args:
+            variant (dict, optional): Request inputs that change the response body (route, path and query params);
+            without one the tag is the catalog version, as for the full catalog
+
+        Returns:
+            str: Quoted entity tag
+        """
+        if not variant:
+            return f'"{self.version}"'
+        canonical = json.dumps(variant, sort_keys=True, separators=(',', ':'), default=str)
+        digest = hashlib.sha256(f"{self.version}\x1e{canonical}".encode('utf-8')).hexdigest()[:32]
+        return f'"{digest}"'
+
+    @staticmethod
+    def _compute_version(items: List[ImprovActivity]) -> str:
+        pairs = sorted(f"{activity.id}\x1f{activity.updated_at}" for activity in items)
+        digest = hashlib.sha256(f"{len(pairs)}\x1e".encode('utf-8'))
+        for pair in pairs:
+            digest.update(pair.encode('utf-8'))
+            digest.update(b'\x1e')
+        return digest.hexdigest()[:32]
@@ -0,0 +1,55 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+_signing_key = os.environ.get('CURSOR_SIGNING_KEY', '').encode('utf-8')
+if not _signing_key:
+    # Cursors then only validate within this container; set CURSOR_SIGNING_KEY to share them
+    logger.warning("CURSOR_SIGNING_KEY not set, using a per-process pagination key")
+    _signing_key = secrets.token_bytes(32)
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(_signing_key, payload, hashlib.sha256).digest()[:16]
+
+def encode_cursor(last_evaluated_key: Dict[str, Any]) -> str:
+    """
+    Encode a DynamoDB LastEvaluatedKey as an opaque, signed continuation token.
+    """
+    payload = json.dumps(last_evaluated_key, separators=(',', ':'), sort_keys=True, default=str).encode('utf-8')
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a continuation token produced by encode_cursor.
+
+    Raises:
+        ValueError: If the token is malformed or its signature does not match
+    """
+    try:
+        encoded_payload, encoded_signature = cursor.split('.', 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise ValueError("Invalid cursor")
+    try:
+        key = json.loads(payload)
+    except json.JSONDecodeError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid cursor")
+    return key
@@ -1,14 +1,47 @@
-import boto3
 import os
 import logging
-from typing import Any, Dict, Optional, List
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Dict, Iterator, Optional, List, Tuple
 from botocore.exceptions import ClientError
 
+from lib import metrics
+from lib.aws import get_resource
+
 logger = logging.getLogger(__name__)
 
-# Initialize DynamoDB client and resource
-dynamodb_client = boto3.client('dynamodb', region_name="us-east-2")
-dynamodb_resource: Any = boto3.resource('dynamodb', region_name="us-east-2")
+# Backoff (seconds) between batch_get_items retries of UnprocessedKeys
+BATCH_BACKOFF_BASE = 0.05
+BATCH_BACKOFF_CAP = 2.0
+
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+def _with_capacity(params: Dict[str, Any]) -> Dict[str, Any]:
+    # ConsumedCapacity costs nothing to return and feeds the per-request read/write cost metrics
+    return {'ReturnConsumedCapacity': 'TOTAL', **params}
+
+def _record(response: Dict[str, Any], items: int = 0, capacity_metric: str = 'ReadCapacityUnits') -> None:
+    metrics.put('DynamoDBCalls', 1)
+    if items:
+        metrics.put('DynamoDBItems', items)
+    metrics.record_consumed_capacity(response, capacity_metric)
+
+def _thread_table(table):
+    # boto3 resources are not thread-safe, so worker threads use their own (around the shared client)
+    return get_resource('dynamodb').Table(table.table_name)
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    # Pools are kept for the life of the container so worker threads (and their resources) are reused
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dynamo')
+            _executors[max_workers] = executor
+        return executor
 
 def get_table(table_name: Optional[str] = None):
     """
@@ -29,7 +62,7 @@ def get_table(table_name: Optional[str] = None):
             raise ValueError("Table name must be provided or set in DYNAMODB_TABLE_NAME environment variable")
     
     try:
-        table = dynamodb_resource.Table(table_name)
+        table = get_resource('dynamodb').Table(table_name)
         logger.info(f"Successfully connected to table: {table_name}")
         return table
     except ClientError as e:
@@ -51,20 +84,23 @@ def put_item(table, item: Dict[str, Any]) -> Dict[str, Any]:
         ClientError: If the put operation fails
     """
     try:
-        response = table.put_item(Item=item)
+        with metrics.phase('dynamo'):
+            response = table.put_item(**_with_capacity({'Item': item}))
+        _record(response, capacity_metric='WriteCapacityUnits')
         logger.info(f"Successfully put item into table: {table.table_name}")
         return response
     except ClientError as e:
         logger.error(f"Error putting item into table {table.table_name}: {e}")
         raise
 
-def get_item(table, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def get_item(table, key: Dict[str, Any], **kwargs) -> Optional[Dict[str, Any]]:
     """
     Get an item from a DynamoDB table.
     
     Args:
         table: DynamoDB table resource
         key (dict): Primary key of the item to retrieve
+        **kwargs: Additional parameters for the get operation (e.g., ProjectionExpression)
         
     Returns:
         dict or None: Item if found, None otherwise
@@ -73,8 +109,10 @@ def get_item(table, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         ClientError: If the get operation fails
     """
     try:
-        response = table.get_item(Key=key)
+        with metrics.phase('dynamo'):
+            response = table.get_item(**_with_capacity({'Key': key, **kwargs}))
         item = response.get('Item')
+        _record(response, 1 if item else 0)
         if item:
             logger.info(f"Successfully retrieved item from table: {table.table_name}")
         else:
@@ -111,7 +149,9 @@ def update_item(table, key: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str
         }
         update_params.update(updates)
         
-        response = table.update_item(**update_params)
+        with metrics.phase('dynamo'):
+            response = table.update_item(**_with_capacity(update_params))
+        _record(response, capacity_metric='WriteCapacityUnits')
         logger.info(f"Successfully updated item in table: {table.table_name}")
         return response
     except ClientError as e:
@@ -133,72 +173,237 @@ def delete_item(table, key: Dict[str, Any]) -> Dict[str, Any]:
         ClientError: If the delete operation fails
     """
     try:
-        response = table.delete_item(Key=key)
+        with metrics.phase('dynamo'):
+            response = table.delete_item(**_with_capacity({'Key': key}))
+        _record(response, capacity_metric='WriteCapacityUnits')
         logger.info(f"Successfully deleted item from table: {table.table_name}")
         return response
     except ClientError as e:
         logger.error(f"Error deleting item from table {table.table_name}: {e}")
         raise
 
-def scan_table(table, **kwargs) -> List[Dict[str, Any]]:
+def iter_scan(table, **kwargs) -> Iterator[Dict[str, Any]]:
     """
-    Scan a DynamoDB table and return all items.
+    Scan a DynamoDB table, yielding items page by page.
+    
+    Only one page is held in memory at a time, so callers can stream results
+    without materializing the whole table.
     
     Args:
         table: DynamoDB table resource
         **kwargs: Additional parameters for the scan operation (e.g., FilterExpression, Limit)
         
-    Returns:
-        list: List of all items in the table
+    Yields:
+        dict: Each item in the table
         
     Raises:
         ClientError: If the scan operation fails
     """
+    scan_params = _with_capacity(kwargs)
     try:
-        items = []
-        
-        # Perform initial scan
-        response = table.scan(**kwargs)
-        items.extend(response.get('Items', []))
+        while True:
+            with metrics.phase('dynamo'):
+                response = table.scan(**scan_params)
+            items = response.get('Items', [])
+            _record(response, len(items))
+            yield from items
+            
+            # Handle pagination
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    except ClientError as e:
+        logger.error(f"Error scanning table {table.table_name}: {e}")
+        raise
+
+def scan_page(table, limit: int, exclusive_start_key: Optional[Dict[str, Any]] = None,
+              **kwargs) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Scan a single page of a DynamoDB table.
+    
+    Args:
+        table: DynamoDB table resource
+        limit (int): Maximum number of items to evaluate
+        exclusive_start_key (dict, optional): LastEvaluatedKey of the previous page
+        **kwargs: Additional parameters for the scan operation
         
-        # Handle pagination
-        while 'LastEvaluatedKey' in response:
-            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
-            response = table.scan(**kwargs)
-            items.extend(response.get('Items', []))
+    Returns:
+        tuple: (items, LastEvaluatedKey or None when the scan is complete)
         
-        logger.info(f"Successfully scanned table {table.table_name}, found {len(items)} items")
-        return items
+    Raises:
+        ClientError: If the scan operation fails
+    """
+    scan_params = _with_capacity({'Limit': limit, **kwargs})
+    if exclusive_start_key:
+        scan_params['ExclusiveStartKey'] = exclusive_start_key
+    try:
+        with metrics.phase('dynamo'):
+            response = table.scan(**scan_params)
+        items = response.get('Items', [])
+        _record(response, len(items))
+        logger.info(f"Successfully scanned page of table {table.table_name}, found {len(items)} items")
+        return items, response.get('LastEvaluatedKey')
     except ClientError as e:
         logger.error(f"Error scanning table {table.table_name}: {e}")
         raise
 
+def scan_table(table, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Scan a DynamoDB table and return all items.
+    
+    Args:
+        table: DynamoDB table resource
+        **kwargs: Additional parameters for the scan operation (e.g., FilterExpression, Limit)
+        
+    Returns:
+        list: List of all items in the table
+        
+    Raises:
+        ClientError: If the scan operation fails
+    """
+    items = list(iter_scan(table, **kwargs))
+    logger.info(f"Successfully scanned table {table.table_name}, found {len(items)} items")
+    return items
+
+def parallel_scan(table, segments: int = 4, max_workers: Optional[int] = None, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Scan a DynamoDB table using parallel segments and return all items.
+    
+    Each segment (Segment/TotalSegments) is scanned to completion on a worker thread;
+    results are concatenated in segment order so the output order is stable.
+    
+    Args:
+        table: DynamoDB table resource
+        segments (int): Number of segments to split the table into
+        max_workers (int, optional): Number of concurrent segment scans (defaults to segments)
+        **kwargs: Additional parameters applied to every segment scan (e.g., FilterExpression, ProjectionExpression)
+        
+    Returns:
+        list: List of all items in the table
+        
+    Raises:
+        ClientError: If any segment scan fails
+    """
+    if segments <= 1:
+        return scan_table(table, **kwargs)
+    
+    def scan_segment(segment: int) -> List[Dict[str, Any]]:
+        segment_table = _thread_table(table)
+        return list(iter_scan(segment_table, Segment=segment, TotalSegments=segments, **kwargs))
+    
+    executor = _get_executor(max_workers or segments)
+    items = []
+    with metrics.phase('dynamo'):
+        # Each segment runs in a copy of this context so its calls are recorded against the current request
+        futures = [executor.submit(copy_context().run, scan_segment, segment) for segment in range(segments)]
+        for future in futures:
+            items.extend(future.result())
+    
+    logger.info(f"Successfully scanned table {table.table_name} in {segments} segments, found {len(items)} items")
+    return items
+
 # Helper functions for common DynamoDB operations
 
-def batch_get_items(table, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def build_projection(fields: List[str]) -> Dict[str, Any]:
+    """
+    Build ProjectionExpression parameters for a list of attribute paths.
+    
+    Every path segment is aliased through ExpressionAttributeNames, so reserved
+    words (e.g. name, type, level) and nested paths (e.g. requirements.players) work.
+    
+    Args:
+        fields (list): Attribute names or dotted paths to project
+        
+    Returns:
+        dict: ProjectionExpression and ExpressionAttributeNames, ready to pass as kwargs
+    """
+    names: Dict[str, str] = {}
+    aliases: Dict[str, str] = {}
+    expressions = []
+    for field in fields:
+        parts = []
+        for part in field.split('.'):
+            if part not in aliases:
+                aliases[part] = f"#p{len(aliases)}"
+                names[aliases[part]] = part
+            parts.append(aliases[part])
+        expressions.append('.'.join(parts))
+    return {
+        'ProjectionExpression': ', '.join(expressions),
+        'ExpressionAttributeNames': names
+    }
+
+def _key_tuple(key: Dict[str, Any], key_names: List[str]) -> Tuple:
+    return tuple(key.get(name) for name in key_names)
+
+def batch_get_items(table, keys: List[Dict[str, Any]], max_workers: int = 4, max_retries: int = 8,
+                    **kwargs) -> List[Dict[str, Any]]:
     """
     Batch get multiple items from a DynamoDB table.
     
+    Duplicate keys are requested once, 100-key chunks are fetched concurrently and
+    UnprocessedKeys are retried with jittered exponential backoff.
+    
     Args:
         table: DynamoDB table resource
         keys (list): List of primary keys
+        max_workers (int): Number of chunks fetched concurrently
+        max_retries (int): Retries per chunk while DynamoDB returns UnprocessedKeys
+        **kwargs: Additional parameters for the table's request (e.g., ProjectionExpression, ConsistentRead);
+                  a projection must include the key attributes
         
     Returns:
-        list: List of retrieved items
+        list: Retrieved items in the order of their first key in `keys`; keys not found are omitted
+        
+    Raises:
+        ClientError: If a batch request fails
+        RuntimeError: If keys are still unprocessed after max_retries
     """
+    if not keys:
+        return []
+    
+    key_names = sorted(keys[0].keys())
+    unique_keys = []
+    seen = set()
+    for key in keys:
+        key_tuple = _key_tuple(key, key_names)
+        if key_tuple not in seen:
+            seen.add(key_tuple)
+            unique_keys.append(key)
+    
+    def fetch_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        resource = get_resource('dynamodb')
+        request = {table.table_name: {'Keys': chunk, **kwargs}}
+        found = []
+        for attempt in range(max_retries + 1):
+            response = resource.batch_get_item(RequestItems=request, ReturnConsumedCapacity='TOTAL')
+            chunk_items = response.get('Responses', {}).get(table.table_name, [])
+            _record(response, len(chunk_items))
+            found.extend(chunk_items)
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                return found
+            if attempt < max_retries:
+                time.sleep(random.uniform(0, min(BATCH_BACKOFF_CAP, BATCH_BACKOFF_BASE * 2 ** attempt)))
+        unprocessed = len(request.get(table.table_name, {}).get('Keys', []))
+        raise RuntimeError(f"{unprocessed} keys still unprocessed after {max_retries} retries")
+    
     try:
         # DynamoDB batch_get_item has a limit of 100 items per request
-        items = []
-        for i in range(0, len(keys), 100):
-            batch_keys = keys[i:i+100]
-            response = dynamodb_resource.batch_get_item(
-                RequestItems={
-                    table.table_name: {
-                        'Keys': batch_keys
-                    }
-                }
-            )
-            items.extend(response['Responses'].get(table.table_name, []))
+        chunks = [unique_keys[i:i+100] for i in range(0, len(unique_keys), 100)]
+        with metrics.phase('dynamo'):
+            if len(chunks) == 1:
+                results = [fetch_chunk(chunks[0])]
+            else:
+                executor = _get_executor(max_workers)
+                futures = [executor.submit(copy_context().run, fetch_chunk, chunk) for chunk in chunks]
+                results = [future.result() for future in futures]
+        
+        by_key = {}
+        for chunk_items in results:
+            for item in chunk_items:
+                by_key[_key_tuple(item, key_names)] = item
+        items = [by_key[key_tuple] for key_tuple in (_key_tuple(key, key_names) for key in unique_keys) if key_tuple in by_key]
         
         logger.info(f"Successfully batch retrieved {len(items)} items from table: {table.table_name}")
         return items
@@ -206,37 +411,146 @@ def batch_get_items(table, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         logger.error(f"Error batch getting items from table {table.table_name}: {e}")
         raise
 
-def query_table(table, key_condition_expression, **kwargs) -> List[Dict[str, Any]]:
+def batch_write_items(table, items: List[Dict[str, Any]], max_workers: int = 4, max_retries: int = 8) -> Dict[str, Any]:
     """
-    Query a DynamoDB table.
+    Put many items into a DynamoDB table with BatchWriteItem.
+    
+    Items with the same key are written once (the last one wins, as DynamoDB rejects duplicate
+    keys in one batch), 25-item chunks are written concurrently and UnprocessedItems are retried
+    with jittered exponential backoff.
     
     Args:
         table: DynamoDB table resource
-        key_condition_expression: Key condition for the query
-        **kwargs: Additional parameters for the query operation
+        items (list): Items to put
+        max_workers (int): Number of chunks written concurrently
+        max_retries (int): Retries per chunk while DynamoDB returns UnprocessedItems
         
     Returns:
-        list: List of items matching the query
+        dict: 'written' (number of items) and 'capacity_units' (write capacity consumed)
+        
+    Raises:
+        ClientError: If a batch request fails
+        RuntimeError: If items are still unprocessed after max_retries
     """
+    if not items:
+        return {'written': 0, 'capacity_units': 0.0}
+    
+    key_names = [element['AttributeName'] for element in table.key_schema]
+    unique_items = list({_key_tuple(item, key_names): item for item in items}.values())
+    
+    def write_chunk(chunk: List[Dict[str, Any]]) -> float:
+        resource = get_resource('dynamodb')
+        request = {table.table_name: [{'PutRequest': {'Item': item}} for item in chunk]}
+        capacity_units = 0.0
+        for attempt in range(max_retries + 1):
+            response = resource.batch_write_item(RequestItems=request, ReturnConsumedCapacity='TOTAL')
+            _record(response, capacity_metric='WriteCapacityUnits')
+            capacity_units += sum(float(entry.get('CapacityUnits') or 0) for entry in response.get('ConsumedCapacity') or [])
+            request = response.get('UnprocessedItems') or {}
+            if not request:
+                return capacity_units
+            if attempt < max_retries:
+                time.sleep(random.uniform(0, min(BATCH_BACKOFF_CAP, BATCH_BACKOFF_BASE * 2 ** attempt)))
+        unprocessed = len(request.get(table.table_name, []))
+        raise RuntimeError(f"{unprocessed} items still unprocessed after {max_retries} retries")
+    
     try:
-        items = []
+        # DynamoDB batch_write_item has a limit of 25 items per request
+        chunks = [unique_items[i:i+25] for i in range(0, len(unique_items), 25)]
+        with metrics.phase('dynamo'):
+            executor = _get_executor(max_workers)
+            futures = [executor.submit(copy_context().run, write_chunk, chunk) for chunk in chunks]
+            capacity_units = sum(future.result() for future in futures)
         
-        query_params = {
-            'KeyConditionExpression': key_condition_expression,
-            **kwargs
-        }
+        logger.info(f"Successfully batch wrote {len(unique_items)} items to table: {table.table_name}")
+        return {'written': len(unique_items), 'capacity_units': capacity_units}
+    except ClientError as e:
+        logger.error(f"Error batch writing items to table {table.table_name}: {e}")
+        raise
+
+def iter_query(table, key_condition_expression, **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Query a DynamoDB table, yielding items page by page.
+    
+    Args:
+        table: DynamoDB table resource
+        key_condition_expression: Key condition for the query
+        **kwargs: Additional parameters for the query operation
         
-        response = table.query(**query_params)
-        items.extend(response.get('Items', []))
+    Yields:
+        dict: Each item matching the query
         
-        # Handle pagination
-        while 'LastEvaluatedKey' in response:
+    Raises:
+        ClientError: If the query operation fails
+    """
+    query_params = _with_capacity({
+        'KeyConditionExpression': key_condition_expression,
+        **kwargs
+    })
+    try:
+        while True:
+            with metrics.phase('dynamo'):
+                response = table.query(**query_params)
+            items = response.get('Items', [])
+            _record(response, len(items))
+            yield from items
+            
+            # Handle pagination
+            if 'LastEvaluatedKey' not in response:
+                break
             query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
-            response = table.query(**query_params)
-            items.extend(response.get('Items', []))
+    except ClientError as e:
+        logger.error(f"Error querying table {table.table_name}: {e}")
+        raise
+
+def query_page(table, key_condition_expression, limit: int, exclusive_start_key: Optional[Dict[str, Any]] = None,
+               **kwargs) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Query a single page of a DynamoDB table or index.
+    
+    Args:
+        table: DynamoDB table resource
+        key_condition_expression: Key condition for the query
+        limit (int): Maximum number of items to evaluate
+        exclusive_start_key (dict, optional): LastEvaluatedKey of the previous page
+        **kwargs: Additional parameters for the query operation (e.g., IndexName)
         
-        logger.info(f"Successfully queried table {table.table_name}, found {len(items)} items")
-        return items
+    Returns:
+        tuple: (items, LastEvaluatedKey or None when the query is complete)
+        
+    Raises:
+        ClientError: If the query operation fails
+    """
+    query_params = _with_capacity({
+        'KeyConditionExpression': key_condition_expression,
+        'Limit': limit,
+        **kwargs
+    })
+    if exclusive_start_key:
+        query_params['ExclusiveStartKey'] = exclusive_start_key
+    try:
+        with metrics.phase('dynamo'):
+            response = table.query(**query_params)
+        items = response.get('Items', [])
+        _record(response, len(items))
+        logger.info(f"Successfully queried page of table {table.table_name}, found {len(items)} items")
+        return items, response.get('LastEvaluatedKey')
     except ClientError as e:
         logger.error(f"Error querying table {table.table_name}: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def query_table(table, key_condition_expression, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Query a DynamoDB table.
+    
+    Args:
+        table: DynamoDB table resource
+        key_condition_expression: Key condition for the query
+        **kwargs: Additional parameters for the query operation
+        
+    Returns:
+        list: List of items matching the query
+    """
+    items = list(iter_query(table, key_condition_expression, **kwargs))
+    logger.info(f"Successfully queried table {table.table_name}, found {len(items)} items")
+    return items
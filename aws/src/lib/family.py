@@ -0,0 +1,138 @@
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from model.ImprovActivity import ImprovActivity
+
+logger = logging.getLogger(__name__)
+
+class FamilyIndex:
+    """
+    Adjacency index over the parent/variant references of a list of activities.
+
+    Links are taken from both sides: an activity's `parent` and its parent's `variants` each
+    establish the edge, so a reference recorded on only one side still joins the family. When
+    they disagree, the child's own `parent` wins. References to ids that are not in the catalog
+    are kept aside as dangling, and activities whose parent chain loops are marked as cyclic,
+    so traversals always terminate and can report both.
+    """
+
+    def __init__(self, items: List[ImprovActivity]):
+        positions = {activity.id: position for position, activity in enumerate(items)}
+        self.ids = [activity.id for activity in items]
+        self.parents: List[Optional[int]] = [None] * len(items)
+        self.children: List[List[int]] = [[] for _ in items]
+        # Activity id -> referenced ids (parent or variants) that are not in the catalog
+        self.dangling: Dict[str, List[str]] = {}
+
+        for position, activity in enumerate(items):
+            if activity.parent:
+                parent = positions.get(activity.parent)
+                if parent is None:
+                    self.dangling.setdefault(activity.id, []).append(activity.parent)
+                else:
+                    self.parents[position] = parent
+        for position, activity in enumerate(items):
+            for variant_id in activity.variants:
+                variant = positions.get(variant_id)
+                if variant is None:
+                    self.dangling.setdefault(activity.id, []).append(variant_id)
+                elif self.parents[variant] is None and not items[variant].parent:
+                    self.parents[variant] = position
+
+        # Children in declaration order of the parent's variants, then any only linked by their parent attribute
+        for position, parent in enumerate(self.parents):
+            if parent is not None:
+                self.children[parent].append(position)
+        for position, activity in enumerate(items):
+            if len(self.children[position]) > 1:
+                order = {variant_id: rank for rank, variant_id in enumerate(activity.variants)}
+                self.children[position].sort(key=lambda child: (order.get(self.ids[child], len(order)), child))
+
+        self.cyclic = self._find_cycles()
+        if self.dangling or self.cyclic:
+            logger.warning(f"Activity families: {len(self.dangling)} activities with dangling references, "
+                           f"{len(self.cyclic)} in parent cycles")
+
+    def _find_cycles(self) -> set:
+        """
+        Positions on a parent cycle. Each activity has at most one parent, so every chain is walked once.
+        """
+        state = [0] * len(self.parents)  # 0 unvisited, 1 on the current chain, 2 done
+        cyclic = set()
+        for start in range(len(self.parents)):
+            chain = []
+            position: Optional[int] = start
+            while position is not None and state[position] == 0:
+                state[position] = 1
+                chain.append(position)
+                position = self.parents[position]
+            if position is not None and state[position] == 1:
+                cyclic.update(chain[chain.index(position):])
+            for visited in chain:
+                state[visited] = 2
+        return cyclic
+
+    def ancestors(self, position: int, depth: int) -> List[int]:
+        """
+        Parent, grandparent, ... of an activity (nearest first), at most `depth` of them.
+        """
+        found = []
+        seen = {position}
+        parent = self.parents[position]
+        while parent is not None and parent not in seen and len(found) < depth:
+            found.append(parent)
+            seen.add(parent)
+            parent = self.parents[parent]
+        return found
+
+    def descendants(self, position: int, depth: int) -> List[int]:
+        """
+        Variants of an activity and their variants, breadth first, down to `depth` generations.
+        """
+        found = []
+        seen = {position}
+        queue = deque([(position, 0)])
+        while queue:
+            current, generation = queue.popleft()
+            if generation == depth:
+                continue
+            for child in self.children[current]:
+                if child not in seen:
+                    seen.add(child)
+                    found.append(child)
+                    queue.append((child, generation + 1))
+        return found
+
+    def siblings(self, position: int) -> List[int]:
+        """
+        Other variants of the activity's parent.
+        """
+        parent = self.parents[position]
+        if parent is None:
+            return []
+        return [child for child in self.children[parent] if child != position]
+
+    def family(self, position: int, depth: int) -> Dict[str, Any]:
+        """
+        Positions of an activity's relatives and any reference problems among them.
+
+        Args:
+            position (int): Catalog position of the activity
+            depth (int): Generations to follow up (ancestors) and down (descendants)
+
+        Returns:
+            dict: ancestors, descendants and siblings (lists of positions), plus cyclic (ids on a
+            parent cycle) and dangling (id -> missing referenced ids) for the activities returned
+        """
+        ancestors = self.ancestors(position, depth)
+        descendants = self.descendants(position, depth)
+        siblings = self.siblings(position)
+        members = list(dict.fromkeys([position, *ancestors, *descendants, *siblings]))
+        return {
+            'ancestors': ancestors,
+            'descendants': descendants,
+            'siblings': siblings,
+            'cyclic': [self.ids[member] for member in members if member in self.cyclic],
+            'dangling': {self.ids[member]: self.dangling[self.ids[member]] for member in members if self.ids[member] in self.dangling}
+        }
@@ -0,0 +1,80 @@
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from model.ImprovActivity import ImprovActivity
+
+# Named field presets for ?view=; None means every field
+VIEWS: Dict[str, Optional[List[str]]] = {
+    'card': ['name', 'brief', 'type', 'level', 'tags'],
+    'full': None,
+}
+
+# Shape of an encoded activity, used to validate requested (possibly nested) field paths
+_ACTIVITY_SHAPE = ImprovActivity().to_item()
+
+def parse_fields(query_params: Dict[str, str]) -> Optional[List[str]]:
+    """
+    Resolve ?fields= and ?view= into a list of field paths.
+
+    Args:
+        query_params (dict): Request query parameters (e.g. fields=name,brief,requirements.players)
+
+    Returns:
+        list or None: Dotted field paths to return (always including id, without paths nested in another
+        requested path), or None for the full activity
+
+    Raises:
+        ValueError: If the view is unknown or a field path does not exist on ImprovActivity
+    """
+    view = query_params.get('view')
+    raw_fields = query_params.get('fields')
+    if view and raw_fields:
+        raise ValueError("Use either fields or view, not both")
+    if view:
+        if view not in VIEWS:
+            raise ValueError(f"Invalid view: {view} (allowed: {', '.join(VIEWS)})")
+        fields = VIEWS[view]
+    elif raw_fields:
+        fields = [field.strip() for field in raw_fields.split(',') if field.strip()]
+    else:
+        return None
+    if fields is None:
+        return None
+
+    for field in fields:
+        shape: Any = _ACTIVITY_SHAPE
+        for part in field.split('.'):
+            if not isinstance(shape, dict) or part not in shape:
+                raise ValueError(f"Invalid field: {field}")
+            shape = shape[part]
+    # DynamoDB rejects overlapping document paths in a projection, so a child path is covered by its parent
+    fields = list(dict.fromkeys(fields))
+    requested = set(fields)
+    fields = [field for field in fields
+              if not any(field[:index] in requested for index, char in enumerate(field) if char == '.')]
+    return ['id'] + [field for field in fields if field != 'id']
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return sorted(entry.value if isinstance(entry, Enum) else entry for entry in value)
+    if hasattr(value, 'to_item'):
+        return value.to_item()
+    return value
+
+def project_activity(activity: ImprovActivity, fields: List[str]) -> Dict[str, Any]:
+    """
+    Encode only the requested field paths of an activity, nesting dotted paths (e.g. requirements.players).
+    """
+    projected: Dict[str, Any] = {}
+    for field in fields:
+        parts = field.split('.')
+        value: Any = activity
+        for part in parts:
+            value = getattr(value, part)
+        target = projected
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = _plain(value)
+    return projected
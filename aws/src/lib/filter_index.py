@@ -0,0 +1,124 @@
+from enum import Enum
+from typing import Any, Dict, Iterable, List
+
+from model.ImprovActivity import (
+    ImprovActivity, ActivityTag, ActivitySkill, ActivityLevel, ActivityType, ActivityField,
+    ActivityComplexity, ActivitySkillCeiling, PhysicalityLevel, VocalityLevel
+)
+
+# Query parameter -> (activity attribute path, enum of allowed values)
+FILTER_FIELDS: Dict[str, tuple] = {
+    'tags': ('tags', ActivityTag),
+    'skills': ('skills', ActivitySkill),
+    'level': ('level', ActivityLevel),
+    'type': ('type', ActivityType),
+    'field': ('field', ActivityField),
+    'complexity': ('complexity', ActivityComplexity),
+    'skill_ceiling': ('skill_ceiling', ActivitySkillCeiling),
+    'physicality': ('requirements.physicality.minimum', PhysicalityLevel),
+    'vocality': ('requirements.vocality.minimum', VocalityLevel),
+}
+
+def _get_path(activity: ImprovActivity, path: str) -> Any:
+    value: Any = activity
+    for part in path.split('.'):
+        value = getattr(value, part, None)
+    return value
+
+def _values(raw: Any) -> Iterable[str]:
+    if raw is None:
+        return ()
+    if isinstance(raw, Enum):
+        return (raw.value,)
+    if isinstance(raw, (set, frozenset, list, tuple)):
+        return (value.value if isinstance(value, Enum) else str(value) for value in raw)
+    return (str(raw),)
+
+class FilterIndex:
+    """
+    Bitmap index over the enum-valued fields of a list of activities.
+
+    Each (field, value) pair owns one bitset (a Python int) with bit i set when activity i
+    has that value. Filters OR the requested values of a field together and AND the
+    fields, so a query and its facet counts cost a handful of big-int operations
+    regardless of how many activities match.
+    """
+
+    def __init__(self, items: List[ImprovActivity]):
+        self.size = len(items)
+        self.all = (1 << self.size) - 1
+        self.bitsets: Dict[str, Dict[str, int]] = {}
+
+        nbytes = (self.size + 7) // 8
+        for param, (path, enum) in FILTER_FIELDS.items():
+            buffers = {member.value: bytearray(nbytes) for member in enum}
+            for position, activity in enumerate(items):
+                for value in _values(_get_path(activity, path)):
+                    buffer = buffers.get(value)
+                    if buffer is not None:
+                        buffer[position >> 3] |= 1 << (position & 7)
+            self.bitsets[param] = {value: int.from_bytes(buffer, 'little') for value, buffer in buffers.items()}
+
+    @staticmethod
+    def parse_filters(query_params: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Extract filter values from query parameters.
+
+        Args:
+            query_params (dict): Request query parameters, values comma separated (e.g. tags=musical,hosted)
+
+        Returns:
+            dict: Filter parameter -> list of requested enum values
+
+        Raises:
+            ValueError: If a value is not a member of the parameter's enum
+        """
+        filters = {}
+        for param, (_, enum) in FILTER_FIELDS.items():
+            raw = query_params.get(param)
+            if not raw:
+                continue
+            values = [value.strip().lower() for value in raw.split(',') if value.strip()]
+            allowed = {member.value for member in enum}
+            invalid = [value for value in values if value not in allowed]
+            if invalid:
+                raise ValueError(f"Invalid {param}: {', '.join(invalid)} (allowed: {', '.join(sorted(allowed))})")
+            if values:
+                filters[param] = values
+        return filters
+
+    def match(self, filters: Dict[str, List[str]]) -> int:
+        """
+        Bitset of the activities matching every filter (any of the values within a filter).
+        """
+        mask = self.all
+        for param, values in filters.items():
+            field_mask = 0
+            for value in values:
+                field_mask |= self.bitsets[param].get(value, 0)
+            mask &= field_mask
+            if not mask:
+                break
+        return mask
+
+    def positions(self, mask: int) -> List[int]:
+        """
+        Indexes of the set bits in mask, in ascending order.
+        """
+        # Scanning the reversed binary string is much faster than repeatedly isolating the lowest bit of a big int
+        bits = bin(mask)[:1:-1]
+        positions = []
+        position = bits.find('1')
+        while position != -1:
+            positions.append(position)
+            position = bits.find('1', position + 1)
+        return positions
+
+    def facets(self, mask: int) -> Dict[str, Dict[str, int]]:
+        """
+        Number of activities in mask having each value of each filterable field.
+        """
+        return {
+            param: {value: (bitset & mask).bit_count() for value, bitset in bitsets.items()}
+            for param, bitsets in self.bitsets.items()
+        }
@@ -0,0 +1,59 @@
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+from lib.http import RawJSON
+from model.ImprovActivity import ImprovActivity
+
+logger = logging.getLogger(__name__)
+
+class FragmentCache:
+    """
+    Pre-encoded JSON for each activity, keyed by id and invalidated by `updated_at`.
+
+    Kept at module level so that when the catalog is reloaded only activities whose
+    `updated_at` changed (or that have none to compare) are encoded again.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, RawJSON]] = {}
+        self._lock = threading.Lock()
+        self.encoded = 0
+        self.reused = 0
+
+    def get(self, activity: ImprovActivity) -> RawJSON:
+        """
+        JSON fragment for an activity, encoding it if it is new or has changed.
+        """
+        entry = self._entries.get(activity.id)
+        if entry is not None and entry[0] and entry[0] == activity.updated_at:
+            self.reused += 1
+            return entry[1]
+        fragment = RawJSON(activity.to_json())
+        self._entries[activity.id] = (activity.updated_at, fragment)
+        self.encoded += 1
+        return fragment
+
+    def seed(self, activities: List[ImprovActivity], fragments: List[str]) -> None:
+        """
+        Load fragments that were encoded elsewhere (e.g. shipped in a catalog snapshot).
+        """
+        with self._lock:
+            for activity, fragment in zip(activities, fragments):
+                self._entries[activity.id] = (activity.updated_at, RawJSON(fragment))
+
+    def sync(self, activities: List[ImprovActivity]) -> List[RawJSON]:
+        """
+        Encode fragments for a freshly loaded list of activities and drop those no longer present.
+
+        Returns:
+            list: Fragments aligned with `activities`
+        """
+        with self._lock:
+            encoded, reused = self.encoded, self.reused
+            fragments = [self.get(activity) for activity in activities]
+            live_ids = {activity.id for activity in activities}
+            for activity_id in [activity_id for activity_id in self._entries if activity_id not in live_ids]:
+                del self._entries[activity_id]
+            logger.info(f"Synced JSON fragments: {self.encoded - encoded} encoded, {self.reused - reused} reused")
+            return fragments
@@ -1,37 +1,207 @@
+import base64
+import gzip
+import hashlib
+import itertools
 import json
-from typing import Any, Dict, Optional
+import operator
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
-def create_response(status_code: int, body: Any, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+from lib import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class RawJSON(str):
+    """
+    Text that is already valid JSON; embedded verbatim by encode_json instead of being re-encoded.
+    """
+
+def encode_json(value: Any) -> str:
+    # Only containers holding RawJSON (at any depth) are assembled by hand; everything else goes through json.dumps
+    if isinstance(value, RawJSON):
+        return str(value)
+    if isinstance(value, list) and _contains_raw_json(value):
+        return '[' + ', '.join(encode_json(entry) for entry in value) + ']'
+    if isinstance(value, dict) and _contains_raw_json(value):
+        return '{' + ', '.join(f"{json.dumps(str(key))}: {encode_json(entry)}" for key, entry in value.items()) + '}'
+    return json.dumps(value, default=str)
+
+def _contains_raw_json(value: Any) -> bool:
+    # Breadth first, a level at a time, with map/compress/chain so a large body without fragments is
+    # scanned at C speed (bodies are built from plain dicts and lists)
+    level = [value]
+    while level:
+        kinds = list(map(type, level))
+        if RawJSON in kinds:
+            return True
+        dicts = itertools.compress(level, map(operator.is_, kinds, itertools.repeat(dict)))
+        lists = itertools.compress(level, map(operator.is_, kinds, itertools.repeat(list)))
+        level = [*itertools.chain.from_iterable(map(dict.values, dicts)), *itertools.chain.from_iterable(lists)]
+    return False
+
+# Default Cache-Control max-age (seconds) for successful responses; 0 means clients must revalidate
+HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', '0'))
+
+# Bodies smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+# Number of compressed bodies kept per container, keyed by (ETag, encoding)
+COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE', '32'))
+
+_compressed_cache: 'OrderedDict[Tuple[str, str], bytes]' = OrderedDict()
+_compressed_cache_lock = threading.Lock()
+
+def create_response(status_code: int, body: Any, headers: Optional[Dict[str, str]] = None,
+                    event: Optional[Dict[str, Any]] = None, etag: Optional[str] = None) -> Dict[str, Any]:
     default_headers = {
         'Content-Type': 'application/json',
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'GET,POST,DELETE,OPTIONS',
-        'Access-Control-Allow-Headers': 'content-type'
+        'Access-Control-Allow-Headers': 'content-type,if-none-match',
+        'Access-Control-Expose-Headers': 'etag'
     }
     if headers:
         default_headers.update(headers)
+    # The body is negotiated, so every response to a request (304s included) varies by Accept-Encoding
+    encoding = negotiate_encoding(event) if event is not None else None
+    if event is not None:
+        default_headers['Vary'] = 'Accept-Encoding'
+    # A caller-supplied ETag lets us answer a conditional request before serializing anything
+    etag_supplied = etag is not None
+    if etag_supplied:
+        default_headers['ETag'] = coded_etag(etag, encoding)
+        if event is not None and etag_matches(event, default_headers['ETag']):
+            return create_not_modified(default_headers)
+    if encoding is not None:
+        # The same representation was already compressed for an earlier request
+        cached = get_compressed(etag, encoding) if etag_supplied else None
+        if cached is not None:
+            return create_compressed_response(status_code, default_headers, cached, encoding)
     # Ensure body is JSON serializable
     if body is not None:
         try:
-            json_body = json.dumps(body, default=str)
+            with metrics.phase('serialize'):
+                json_body = encode_json(body)
         except (TypeError, ValueError) as e:
             json_body = json.dumps({"error": "Internal server error - response serialization failed"})
             status_code = 500
     else:
         json_body = json.dumps({})
+    if status_code == 200 and etag is None:
+        etag = compute_etag(json_body)
+        default_headers['ETag'] = coded_etag(etag, encoding)
+        if event is not None and etag_matches(event, default_headers['ETag']):
+            return create_not_modified(default_headers)
+    if encoding is not None:
+        raw_body = json_body.encode('utf-8')
+        if len(raw_body) >= COMPRESSION_MIN_BYTES:
+            with metrics.phase('compress'):
+                compressed = compress(raw_body, encoding)
+            if etag_supplied and status_code == 200:
+                put_compressed(etag, encoding, compressed)
+            return create_compressed_response(status_code, default_headers, compressed, encoding)
     return {
         'statusCode': status_code,
         'headers': default_headers,
         'body': json_body
     }
 
-def response_success(data: Any = None, message: str = "Success") -> Dict[str, Any]:
+def create_compressed_response(status_code: int, headers: Dict[str, str], compressed: bytes, encoding: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {**headers, 'Content-Encoding': encoding},
+        'body': base64.b64encode(compressed).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+def negotiate_encoding(event: Dict[str, Any]) -> Optional[str]:
+    accept_encoding = get_header(event, 'Accept-Encoding')
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for entry in accept_encoding.split(','):
+        name, _, params = entry.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    # Prefer brotli (smaller) when the client accepts it and the module is available
+    for name in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        if accepted.get(name, accepted.get('*', 0.0)) > 0:
+            return name
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=9)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def get_compressed(etag: str, encoding: str) -> Optional[bytes]:
+    with _compressed_cache_lock:
+        compressed = _compressed_cache.get((etag, encoding))
+        if compressed is not None:
+            _compressed_cache.move_to_end((etag, encoding))
+        return compressed
+
+def put_compressed(etag: str, encoding: str, compressed: bytes) -> None:
+    # Also used to prime the cache with a precompressed catalog artifact
+    with _compressed_cache_lock:
+        _compressed_cache[(etag, encoding)] = compressed
+        _compressed_cache.move_to_end((etag, encoding))
+        while len(_compressed_cache) > COMPRESSION_CACHE_SIZE:
+            _compressed_cache.popitem(last=False)
+
+def create_not_modified(headers: Dict[str, str]) -> Dict[str, Any]:
+    headers = {key: value for key, value in headers.items() if key != 'Content-Type'}
+    return {
+        'statusCode': 304,
+        'headers': headers,
+        'body': ''
+    }
+
+def compute_etag(json_body: str) -> str:
+    return '"' + hashlib.sha256(json_body.encode('utf-8')).hexdigest()[:32] + '"'
+
+def coded_etag(etag: str, encoding: Optional[str]) -> str:
+    # A strong ETag must differ between content codings, so gzip/br responses carry the coding in the tag
+    # ("<tag>-gzip"); small bodies sent uncompressed keep it too, which is still unique per representation
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def etag_matches(event: Dict[str, Any], etag: str) -> bool:
+    if_none_match = get_header(event, 'If-None-Match')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in candidates)
+
+def cache_control_header(max_age: Optional[int] = None) -> Dict[str, str]:
+    if max_age is None:
+        max_age = HTTP_CACHE_MAX_AGE
+    if max_age <= 0:
+        return {'Cache-Control': 'no-cache'}
+    return {'Cache-Control': f'public, max-age={max_age}'}
+
+def response_success(data: Any = None, message: str = "Success", event: Optional[Dict[str, Any]] = None,
+                     etag: Optional[str] = None, max_age: Optional[int] = None) -> Dict[str, Any]:
     body = {"message": message}
     if isinstance(data, dict):
         body.update(data)
     elif data is not None:
         body["data"] = data
-    return create_response(200, body)
+    return create_response(200, body, headers=cache_control_header(max_age), event=event, etag=etag)
 
 def response_failed(data: Any = None, message: str = "Failed") -> Dict[str, Any]:
     body = {"message": message}
@@ -41,6 +211,14 @@ def response_failed(data: Any = None, message: str = "Failed") -> Dict[str, Any]
         body["data"] = data
     return create_response(400, body)
 
+def response_not_found(data: Any = None, message: str = "Not found") -> Dict[str, Any]:
+    body = {"message": message}
+    if isinstance(data, dict):
+        body.update(data)
+    elif data is not None:
+        body["data"] = data
+    return create_response(404, body)
+
 def response_error(data: Any = None, message: str = "Error") -> Dict[str, Any]:
     body = {"message": message}
     if isinstance(data, dict):
@@ -53,12 +231,25 @@ def parse_event_body(event: Dict[str, Any]) -> Dict[str, Any]:
     body = event.get('body')
     if not body:
         return {}
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8')
     
     try:
         return json.loads(body)
     except json.JSONDecodeError as e:
         raise ValueError("Invalid JSON in request body")
 
+def get_headers(event: Dict[str, Any]) -> Dict[str, str]:
+    return event.get('headers') or {}
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    # Header names are case-insensitive and API Gateway preserves the client's casing
+    name = name.lower()
+    for key, value in get_headers(event).items():
+        if key.lower() == name:
+            return value
+    return None
+
 def get_path_parameters(event: Dict[str, Any]) -> Dict[str, str]:
     return event.get('pathParameters') or {}
 
@@ -0,0 +1,160 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+# CloudWatch namespace the Embedded Metric Format lines are published under
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'ImprovIndex')
+
+# Fraction of requests instrumented and emitted; cold starts and 5xx responses are always emitted
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '1'))
+
+# Request being recorded in the current context (copied into worker threads with contextvars.copy_context)
+_current: ContextVar[Optional['RequestMetrics']] = ContextVar('request_metrics', default=None)
+# Innermost open phase, so nested or worker-thread phases of the same name are not counted twice
+_open_phase: ContextVar[Optional[str]] = ContextVar('metrics_phase', default=None)
+
+_cold_start = True
+_output: TextIO = sys.stdout
+_output_lock = threading.Lock()
+
+class RequestMetrics:
+    """
+    Measurements for one request: phase durations, counters and properties, emitted as one EMF log line.
+
+    Phases are wall-clock milliseconds summed per name (routing, dynamo, decode, index,
+    serialize, compress). Values recorded from several threads are summed under a lock.
+    """
+
+    def __init__(self, cold_start: bool, sampled: bool):
+        self.cold_start = cold_start
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.dimensions: Dict[str, str] = {'Route': 'unmatched'}
+        self.values: Dict[str, Tuple[float, str]] = {}
+        self.properties: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float, unit: str = 'Count') -> None:
+        with self._lock:
+            current = self.values.get(name)
+            self.values[name] = (value + current[0] if current else value, unit)
+
+    def finish(self, response: Dict[str, Any]) -> None:
+        """
+        Record the outcome of the request from the response about to be returned.
+        """
+        self.values['Latency'] = ((time.perf_counter() - self.started) * 1000, 'Milliseconds')
+        self.values['ResponseBytes'] = (len(response.get('body') or ''), 'Bytes')
+        self.values['ColdStart'] = (1 if self.cold_start else 0, 'Count')
+        self.properties['StatusCode'] = response.get('statusCode')
+
+    def to_emf(self) -> Dict[str, Any]:
+        document: Dict[str, Any] = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [list(self.dimensions)],
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in self.values.items()]
+                }]
+            },
+            **self.dimensions,
+            **self.properties
+        }
+        for name, (value, _) in self.values.items():
+            document[name] = round(value, 3) if isinstance(value, float) else value
+        return document
+
+@contextmanager
+def request(context: Any = None) -> Iterator[RequestMetrics]:
+    """
+    Record one request. Unsampled requests only keep latency, status, route and properties, so they
+    can still be emitted if they fail; sampled ones also collect phases and counters from the code they call.
+    """
+    global _cold_start
+    cold_start, _cold_start = _cold_start, False
+    sampled = cold_start or (METRICS_SAMPLE_RATE > 0 and random.random() < METRICS_SAMPLE_RATE)
+    metrics = RequestMetrics(cold_start, sampled)
+    request_id = getattr(context, 'aws_request_id', None)
+    if request_id:
+        metrics.properties['RequestId'] = request_id
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+    status = metrics.properties.get('StatusCode')
+    if sampled or (isinstance(status, int) and status >= 500):
+        emit(metrics)
+
+def emit(metrics: RequestMetrics) -> None:
+    line = json.dumps(metrics.to_emf(), separators=(',', ':'), default=str)
+    with _output_lock:
+        _output.write(line + '\n')
+        _output.flush()
+
+def set_output(stream: TextIO) -> None:
+    """
+    Send EMF lines somewhere other than stdout (Lambda ships stdout to CloudWatch Logs).
+    """
+    global _output
+    _output = stream
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time a block as part of a named phase of the current request (no-op outside a sampled request).
+    """
+    metrics = _current.get()
+    if metrics is None or not metrics.sampled or _open_phase.get() == name:
+        yield
+        return
+    token = _open_phase.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _open_phase.reset(token)
+        metrics.add(f"Phase.{name}", (time.perf_counter() - start) * 1000, 'Milliseconds')
+
+def put(name: str, value: float, unit: str = 'Count') -> None:
+    """
+    Add to a metric of the current request (summed if recorded more than once).
+    """
+    metrics = _current.get()
+    if metrics is not None and metrics.sampled:
+        metrics.add(name, value, unit)
+
+def set_property(name: str, value: Any) -> None:
+    """
+    Attach a non-metric field (searchable in CloudWatch Logs Insights) to the current request.
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.properties[name] = value
+
+def set_dimension(name: str, value: str) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.dimensions[name] = value
+
+def record_consumed_capacity(response: Dict[str, Any], metric: str = 'ReadCapacityUnits') -> None:
+    """
+    Add the ConsumedCapacity of a DynamoDB response (one entry or a list, for batch calls).
+    """
+    metrics = _current.get()
+    if metrics is None or not metrics.sampled:
+        return
+    consumed = response.get('ConsumedCapacity')
+    if not consumed:
+        return
+    for entry in consumed if isinstance(consumed, list) else (consumed,):
+        units = entry.get('CapacityUnits')
+        if units:
+            metrics.add(metric, float(units))
@@ -0,0 +1,272 @@
+import heapq
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.filter_index import FilterIndex
+from model.ImprovActivity import ImprovActivity, ActivityLevel, ActivitySkill, ActivityType
+
+# Session stages in running order: (name, activity types, share of the session it may take,
+# most activities in a session of REFERENCE_SESSION_MINUTES, scaled with the session length)
+STAGES: Tuple[Tuple[str, Tuple[str, ...], float, int], ...] = (
+    ('warmup', (ActivityType.WARMUP.value,), 0.25, 2),
+    ('exercise', (ActivityType.EXERCISE.value, ActivityType.DRILL.value), 0.5, 3),
+    ('game', (ActivityType.GAME.value,), 0.5, 3),
+)
+
+REFERENCE_SESSION_MINUTES = 90
+
+# Session length bounds for GET /plans?minutes=
+MIN_SESSION_MINUTES = 10
+MAX_SESSION_MINUTES = 240
+
+# Planned minutes for activities that record no duration
+DEFAULT_ACTIVITY_MINUTES = 10
+
+# Candidates kept per stage after pruning (at least this many, and a few per activity the stage
+# may hold), and partial plans kept between solver steps
+STAGE_CANDIDATES = 24
+CANDIDATES_PER_ACTIVITY = 4
+BEAM_WIDTH = 32
+
+# Plan value = covered requested skills, then how much of the session is filled, then how well activities fit
+COVERAGE_WEIGHT = 10.0
+UTILIZATION_WEIGHT = 5.0
+FIT_WEIGHT = 1.0
+
+LEVELS = [member.value for member in ActivityLevel]
+SKILL_BITS = {member.value: 1 << bit for bit, member in enumerate(ActivitySkill)}
+
+class IntervalIndex:
+    """
+    Sorted distinct values of one numeric attribute, each with the bitset of activities whose value
+    is at or below it, so "minimum players <= 6" is one bisect and the bitset it lands on.
+    """
+
+    def __init__(self, values: List[int]):
+        self.keys: List[int] = []
+        self.at_or_below: List[int] = []
+        buffer = bytearray((len(values) + 7) // 8)
+        for position in sorted(range(len(values)), key=values.__getitem__):
+            value = values[position]
+            if self.keys and self.keys[-1] != value:
+                self.at_or_below.append(int.from_bytes(buffer, 'little'))
+            if not self.keys or self.keys[-1] != value:
+                self.keys.append(value)
+            buffer[position >> 3] |= 1 << (position & 7)
+        if self.keys:
+            self.at_or_below.append(int.from_bytes(buffer, 'little'))
+
+    def at_most(self, value: float) -> int:
+        """
+        Bitset of the activities whose value is <= value.
+        """
+        index = bisect_right(self.keys, value)
+        return self.at_or_below[index - 1] if index else 0
+
+class PlanRequest:
+    """
+    Parameters of GET /plans, validated.
+    """
+
+    def __init__(self, players: int, minutes: int, level: Optional[str] = None, skills: Optional[List[str]] = None,
+                 seed: int = 0, count: int = 3):
+        self.players = players
+        self.minutes = minutes
+        self.level = level
+        self.skills = skills or []
+        self.seed = seed
+        self.count = count
+
+    @classmethod
+    def from_query(cls, query_params: Dict[str, str], max_count: int = 10) -> 'PlanRequest':
+        """
+        Parse ?players=&minutes=&level=&skills=&seed=&count=
+
+        Raises:
+            ValueError: If a parameter is missing, not an integer, out of range or not a known enum value
+        """
+        def integer(name: str, default: Optional[int] = None) -> int:
+            raw = query_params.get(name)
+            if raw is None or raw == '':
+                if default is None:
+                    raise ValueError(f"Missing {name}")
+                return default
+            try:
+                return int(raw)
+            except ValueError:
+                raise ValueError(f"{name} must be an integer")
+
+        players = integer('players')
+        minutes = integer('minutes')
+        if players < 1:
+            raise ValueError("players must be at least 1")
+        if not MIN_SESSION_MINUTES <= minutes <= MAX_SESSION_MINUTES:
+            raise ValueError(f"minutes must be between {MIN_SESSION_MINUTES} and {MAX_SESSION_MINUTES}")
+        count = integer('count', 3)
+        if count < 1:
+            raise ValueError("count must be at least 1")
+
+        level = (query_params.get('level') or '').strip().lower() or None
+        if level is not None and level not in LEVELS:
+            raise ValueError(f"Invalid level: {level} (allowed: {', '.join(LEVELS)})")
+        skills = [skill.strip().lower() for skill in (query_params.get('skills') or '').split(',') if skill.strip()]
+        invalid = [skill for skill in skills if skill not in SKILL_BITS]
+        if invalid:
+            raise ValueError(f"Invalid skills: {', '.join(invalid)} (allowed: {', '.join(sorted(SKILL_BITS))})")
+
+        return cls(players, minutes, level, list(dict.fromkeys(skills)), integer('seed', 0), min(count, max_count))
+
+class PlannerIndex:
+    """
+    Interval indexes over player-count and duration requirements, plus the per-activity values
+    the session solver reads, for building workshop plans from a catalog.
+
+    Candidates for each stage are pruned with bitset intersections (type, level, players, duration)
+    and ranked by the requested skills they teach; a beam search then fills the stages in order,
+    knapsack style, maximizing skill coverage within the time budget.
+    """
+
+    def __init__(self, items: List[ImprovActivity], filter_index: FilterIndex):
+        self.ids = [activity.id for activity in items]
+        self.filter_index = filter_index
+        self.skills = [sum(SKILL_BITS[skill.value] for skill in activity.skills) for activity in items]
+        self.levels = [LEVELS.index(activity.level.value) for activity in items]
+        self.players_recommended = [activity.requirements.players.recommended for activity in items]
+        self.minimum_minutes = [activity.requirements.duration.minimum or activity.requirements.duration.average
+                                or DEFAULT_ACTIVITY_MINUTES for activity in items]
+        self.average_minutes = [max(activity.requirements.duration.average, minimum)
+                                for activity, minimum in zip(items, self.minimum_minutes)]
+
+        self.players_minimum_index = IntervalIndex([activity.requirements.players.minimum for activity in items])
+        self.players_recommended_index = IntervalIndex(self.players_recommended)
+        self.duration_minimum_index = IntervalIndex(self.minimum_minutes)
+        self.duration_average_index = IntervalIndex(self.average_minutes)
+
+    def plan(self, request: PlanRequest) -> List[Dict[str, Any]]:
+        """
+        Build the best plans for a session.
+
+        Args:
+            request (PlanRequest): Players, session length, level, skills to cover, seed and number of plans
+
+        Returns:
+            list: Plans, best first, each with its value, planned minutes, covered and missing skills
+            and stages (name and [(position, planned minutes)])
+        """
+        wanted = sum(SKILL_BITS[skill] for skill in request.skills)
+        eligible = self.players_minimum_index.at_most(request.players) & self._level_mask(request.level)
+
+        beam: List[Tuple[float, int, int, float, Tuple]] = [(0.0, 0, 0, 0.0, ())]
+        for stage_index, (_, types, share, limit) in enumerate(STAGES):
+            stage_minutes = share * request.minutes
+            limit = max(1, -(-limit * request.minutes // REFERENCE_SESSION_MINUTES))
+            candidates = self._candidates(eligible, types, stage_minutes, max(STAGE_CANDIDATES, CANDIDATES_PER_ACTIVITY * limit),
+                                          wanted, request)
+            if not candidates:
+                continue
+            beam = self._fill_stage(beam, stage_index, candidates, stage_minutes, limit, wanted, request.minutes)
+
+        plans = []
+        for value, covered, used, _, chosen in beam[:request.count]:
+            stages: List[Dict[str, Any]] = []
+            for stage_index, position, minutes in chosen:
+                name = STAGES[stage_index][0]
+                if not stages or stages[-1]['stage'] != name:
+                    stages.append({'stage': name, 'activities': []})
+                stages[-1]['activities'].append((position, minutes))
+            plans.append({
+                'value': round(value, 4),
+                'minutes': used,
+                'covered_skills': [skill for skill in request.skills if covered & SKILL_BITS[skill]],
+                'missing_skills': [skill for skill in request.skills if not covered & SKILL_BITS[skill]],
+                'stages': stages
+            })
+        return plans
+
+    def _level_mask(self, level: Optional[str]) -> int:
+        # A session for a level also draws on the activities for the levels below it
+        if level is None:
+            return self.filter_index.all
+        mask = 0
+        for value in LEVELS[:LEVELS.index(level) + 1]:
+            mask |= self.filter_index.bitsets['level'].get(value, 0)
+        return mask
+
+    def _fit(self, position: int, request: PlanRequest) -> float:
+        fit = 0.5 if self.players_recommended[position] <= request.players else 0.0
+        if request.level is not None and LEVELS[self.levels[position]] == request.level:
+            fit += 0.5
+        return fit
+
+    def _candidates(self, eligible: int, types: Tuple[str, ...], stage_minutes: float, count: int, wanted: int,
+                    request: PlanRequest) -> List[Tuple[int, int, int, float]]:
+        """
+        Best activities for a stage as (position, minimum minutes, average minutes, fit).
+        """
+        mask = eligible & self.duration_minimum_index.at_most(stage_minutes)
+        type_mask = 0
+        for value in types:
+            type_mask |= self.filter_index.bitsets['type'].get(value, 0)
+        mask &= type_mask
+        if wanted:
+            teaching = 0
+            for skill in request.skills:
+                teaching |= self.filter_index.bitsets['skills'].get(skill, 0)
+            # Prefer activities that teach a requested skill, but fall back to any that fit the stage
+            mask = mask & teaching or mask
+        # Likewise prefer activities that suit the group size and fit the stage at their usual length
+        comfortable = mask & self.players_recommended_index.at_most(request.players) & self.duration_average_index.at_most(stage_minutes)
+        if comfortable.bit_count() >= count:
+            mask = comfortable
+
+        skills = self.skills
+        # Seeded multiplicative hash as the final tie-break, so equal candidates are picked reproducibly per seed
+        salt = (request.seed * 0x9E3779B1) & 0xFFFFFFFF
+        ranked = heapq.nlargest(
+            count,
+            self.filter_index.positions(mask),
+            key=lambda position: ((skills[position] & wanted).bit_count(), self._fit(position, request),
+                                  ((position + 1) * 0x85EBCA6B ^ salt) & 0xFFFFFFFF)
+        )
+        return [(position, self.minimum_minutes[position], self.average_minutes[position], self._fit(position, request))
+                for position in ranked]
+
+    def _fill_stage(self, beam: List[Tuple], stage_index: int, candidates: List[Tuple[int, int, int, float]],
+                    stage_minutes: float, limit: int, wanted: int, budget: int) -> List[Tuple]:
+        """
+        Extend every partial plan with 1..limit activities of a stage, keeping the best BEAM_WIDTH.
+
+        Partial plans are (value, covered skills, minutes used, fit total, ((stage, position, minutes), ...)).
+        Activities are planned at their average length, or squeezed to their minimum when only that fits.
+        """
+        skills = self.skills
+        completed: List[Tuple] = []
+        # Frontier entries also carry the minutes used in this stage and the next candidate index allowed,
+        # so each combination of candidates is generated in only one order
+        frontier = [(plan, 0, 0) for plan in beam]
+        for _ in range(limit):
+            extended = []
+            for (_, covered, used, fit, chosen), stage_used, start in frontier:
+                room = min(budget - used, stage_minutes - stage_used)
+                for index in range(start, len(candidates)):
+                    position, minimum, average, candidate_fit = candidates[index]
+                    minutes = average if average <= room else minimum if minimum <= room else 0
+                    if not minutes:
+                        continue
+                    new_covered = covered | skills[position]
+                    new_used = used + minutes
+                    new_fit = fit + candidate_fit
+                    steps = chosen + ((stage_index, position, minutes),)
+                    value = (COVERAGE_WEIGHT * (new_covered & wanted).bit_count() + UTILIZATION_WEIGHT * new_used / budget
+                             + FIT_WEIGHT * new_fit / len(steps))
+                    extended.append(((value, new_covered, new_used, new_fit, steps), stage_used + minutes, index + 1))
+            if not extended:
+                break
+            extended.sort(key=lambda entry: (-entry[0][0], [step[1] for step in entry[0][4]]))
+            frontier = extended[:BEAM_WIDTH]
+            completed.extend(plan for plan, _, _ in frontier)
+
+        if not completed:
+            return beam
+        completed.sort(key=lambda plan: (-plan[0], [step[1] for step in plan[4]]))
+        return completed[:BEAM_WIDTH]
@@ -0,0 +1,230 @@
+import heapq
+import logging
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from model.ImprovActivity import ImprovActivity
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a term occurrence in each searchable field
+FIELD_BOOSTS: Dict[str, float] = {
+    'name': 3.0,
+    'brief': 2.0,
+    'summary': 1.5,
+    'description': 1.0,
+    'tips': 0.5,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Type-ahead: how many vocabulary terms a trailing prefix may expand to, and their weight
+MAX_PREFIX_EXPANSIONS = 50
+PREFIX_WEIGHT = 0.7
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'their', 'then', 'they', 'this', 'to', 'with'
+))
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ('ations', 'ation', 'ingly', 'ings', 'ing', 'edly', 'ed', 'ies', 'es', 's', 'ly')
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Light suffix-stripping stemmer ("freezing", "freezes" and "freeze" all become "freez").
+    """
+    if len(word) <= 3:
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+            break
+    if word.endswith('e') and len(word) > 3:
+        word = word[:-1]
+    # running -> runn -> run
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'aeiou':
+        word = word[:-1]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase, split on non-alphanumerics, drop stopwords and stem.
+    """
+    return [stem(token) for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def _field_texts(activity: ImprovActivity) -> Dict[str, str]:
+    tips = activity.tips
+    return {
+        'name': ' '.join(activity.name),
+        'brief': activity.brief,
+        'summary': activity.summary,
+        'description': activity.description,
+        'tips': ' '.join(tips.generic + tips.host + tips.player),
+    }
+
+class SearchIndex:
+    """
+    Inverted index over activity text with BM25F ranking.
+
+    Postings hold each document's boosted, length-normalized term frequency, so a query
+    is a dictionary lookup per term plus a sum. The index is synced incrementally: only
+    activities that are new or whose `updated_at` changed are re-tokenized. Documents are
+    normalized against the average field lengths at the time they are indexed, so untouched
+    documents drift slightly as the catalog changes.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.doc_versions: Dict[str, str] = {}
+        self.field_length_totals: Dict[str, int] = {field: 0 for field in FIELD_BOOSTS}
+        self.doc_field_lengths: Dict[str, Dict[str, int]] = {}
+        self.version: Optional[str] = None
+        self._vocabulary: Optional[List[str]] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def __getstate__(self) -> Dict:
+        # Locks cannot be pickled (the index is shipped inside catalog snapshots)
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_vocabulary'] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def sync(self, activities: List[ImprovActivity], version: Optional[str] = None) -> 'SearchIndex':
+        """
+        Bring the index in line with a list of activities, re-indexing only what changed.
+
+        Args:
+            activities (list): The full current catalog
+            version (str, optional): Catalog version the index now reflects
+
+        Returns:
+            SearchIndex: self
+        """
+        with self._lock:
+            if version is not None and version == self.version:
+                return self
+            live_ids = {activity.id for activity in activities}
+            removed = [doc_id for doc_id in self.doc_terms if doc_id not in live_ids]
+            for doc_id in removed:
+                self._remove(doc_id)
+
+            changed = []
+            for activity in activities:
+                indexed_version = self.doc_versions.get(activity.id)
+                if indexed_version and indexed_version == activity.updated_at:
+                    continue
+                self._remove(activity.id)
+                field_counts = {field: Counter(tokenize(text)) for field, text in _field_texts(activity).items()}
+                for field, counts in field_counts.items():
+                    self.field_length_totals[field] += sum(counts.values())
+                changed.append((activity, field_counts))
+
+            # Normalize the (re)indexed documents against the average lengths of the resulting index
+            document_count = len(self.doc_terms) + len(changed)
+            average_lengths = {
+                field: (total / document_count if document_count else 0.0) or 1.0
+                for field, total in self.field_length_totals.items()
+            }
+            for activity, field_counts in changed:
+                self._add(activity, field_counts, average_lengths)
+
+            added = len(changed)
+            if added or removed:
+                self._vocabulary = None
+                logger.info(f"Synced search index: {added} indexed, {len(removed)} removed, {len(self)} documents")
+            self.version = version
+            return self
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True) -> List[Tuple[str, float]]:
+        """
+        Rank activities for a free-text query.
+
+        Args:
+            query (str): Search text
+            limit (int): Maximum number of results
+            prefix (bool): Treat the last query word as a prefix (type-ahead)
+
+        Returns:
+            list: (activity id, score) pairs, best first
+        """
+        raw_tokens = [token for token in _TOKEN_PATTERN.findall(query.lower()) if token not in STOPWORDS]
+        if not raw_tokens:
+            return []
+        with self._lock:
+            weighted_terms: Dict[str, float] = {}
+            for token in raw_tokens:
+                term = stem(token)
+                weighted_terms[term] = max(weighted_terms.get(term, 0.0), 1.0)
+            if prefix:
+                for term in self._expand_prefix(raw_tokens[-1]):
+                    weighted_terms.setdefault(term, PREFIX_WEIGHT)
+
+            document_count = len(self.doc_terms)
+            scores: Dict[str, float] = {}
+            for term, weight in weighted_terms.items():
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf * tf / (K1 + tf)
+            return heapq.nlargest(limit, scores.items(), key=lambda entry: (entry[1], entry[0]))
+
+    def _expand_prefix(self, token: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, token)
+        expansions = []
+        for term in vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            expansions.append(term)
+        return expansions
+
+    def _add(self, activity: ImprovActivity, field_counts: Dict[str, Counter], average_lengths: Dict[str, float]) -> None:
+        # Caller has already added this document's lengths to field_length_totals
+        field_lengths = {field: sum(counts.values()) for field, counts in field_counts.items()}
+        self.doc_field_lengths[activity.id] = field_lengths
+
+        weighted: Dict[str, float] = {}
+        for field, counts in field_counts.items():
+            norm = 1 - B + B * field_lengths[field] / average_lengths[field]
+            for term, count in counts.items():
+                weighted[term] = weighted.get(term, 0.0) + FIELD_BOOSTS[field] * count / norm
+
+        for term, tf in weighted.items():
+            self.postings.setdefault(term, {})[activity.id] = tf
+        self.doc_terms[activity.id] = list(weighted)
+        self.doc_versions[activity.id] = activity.updated_at
+
+    def _remove(self, doc_id: str) -> None:
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        for field, length in self.doc_field_lengths.pop(doc_id, {}).items():
+            self.field_length_totals[field] -= length
+        self.doc_versions.pop(doc_id, None)
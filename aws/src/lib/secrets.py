@@ -1,22 +1,48 @@
 import json
-import boto3
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from lib.aws import get_client
+
+# Seconds a fetched secret is reused before asking Secrets Manager again
+SECRETS_CACHE_TTL = float(os.environ.get('SECRETS_CACHE_TTL', '300'))
+
+_secret_cache: Dict[str, Tuple[float, str]] = {}
+_secret_cache_lock = threading.Lock()
+
+def get_secret_string(secret_id: str, ttl: Optional[float] = None) -> str:
+    ttl = SECRETS_CACHE_TTL if ttl is None else ttl
+    cached = _secret_cache.get(secret_id)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    with _secret_cache_lock:
+        cached = _secret_cache.get(secret_id)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        response = get_client('secretsmanager').get_secret_value(SecretId=secret_id)
+        secret_str = response.get('SecretString')
+        _secret_cache[secret_id] = (time.monotonic(), secret_str)
+        return secret_str
 
 class EnvSecrets:
     def __init__(self):
-        import os
-        client = boto3.client('secretsmanager', region_name="us-east-2")
-        secret_env = os.environ.get("ENV_SECRET_NAME", "INT_SECRETS")
-        response = client.get_secret_value(SecretId=secret_env)
-        secret_str = response.get('SecretString')
-        secret_data = json.loads(secret_str)
-        # Set environment secret attributes
         self.ENV_SECRETS_NAME: str = os.environ.get("ENV_SECRET_NAME", "INT_SECRETS")
-        self.API_BASE_URL: str = secret_data.get('API_BASE_URL')
+
+    @property
+    def secret_data(self) -> Dict[str, str]:
+        # Fetched on first access (and cached with a TTL) rather than in the constructor
+        return json.loads(get_secret_string(self.ENV_SECRETS_NAME))
+
+    @property
+    def API_BASE_URL(self) -> str:
+        return self.secret_data.get('API_BASE_URL')
 
 class SecretsManagerService:
-    def __init__(self):
-        self.client = boto3.client('secretsmanager', region_name="us-east-2")
+    @property
+    def client(self):
+        return get_client('secretsmanager')
 
     def get_secret(self, secret_name):
-        response = self.client.get_secret_value(SecretId=secret_name)
-        return response.get('SecretString')
+        return get_secret_string(secret_name)
@@ -0,0 +1,228 @@
+import logging
+import math
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
+
+from lib.search import tokenize
+from model.ImprovActivity import (
+    ImprovActivity, ActivityTag, ActivitySkill, ActivityType, ActivityField, ActivityLevel, ActivityComplexity,
+    ActivitySkillCeiling, PhysicalityLevel, VocalityLevel
+)
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each feature block in the similarity (blocks are normalized before weighting)
+FEATURE_WEIGHTS = {
+    'tags': 1.0,
+    'skills': 1.0,
+    'type': 0.8,
+    'field': 0.4,
+    'ordinals': 0.8,
+    'ranges': 0.5,
+    'text': 0.6,
+}
+
+# Terms of brief/summary kept as TF-IDF features (the most common ones, minus near-universal terms); 0 disables text
+TEXT_FEATURES = int(os.environ.get('SIMILARITY_TEXT_FEATURES', '128'))
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+# Neighbours computed per lookup (requests for fewer are sliced) and lookups kept for popular activities
+MAX_NEIGHBOURS = 50
+CACHE_SIZE = int(os.environ.get('SIMILARITY_CACHE_SIZE', '1024'))
+
+# Query rows scored per matrix product when precomputing neighbours for the whole catalog
+BATCH_SIZE = 256
+
+ORDINALS = (
+    ('level', ActivityLevel),
+    ('complexity', ActivityComplexity),
+    ('skill_ceiling', ActivitySkillCeiling),
+    ('requirements.physicality.minimum', PhysicalityLevel),
+    ('requirements.physicality.recommended', PhysicalityLevel),
+    ('requirements.vocality.minimum', VocalityLevel),
+    ('requirements.vocality.recommended', VocalityLevel),
+)
+
+def _get_path(activity: ImprovActivity, path: str) -> Any:
+    value: Any = activity
+    for part in path.split('.'):
+        value = getattr(value, part)
+    return value
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour index over a feature matrix of the catalog ("more like this").
+
+    Each activity is a row of one-hot tags, skills, type and field, ordinal levels, log-scaled
+    player and duration ranges and, optionally, TF-IDF weights of its brief and summary. Columns
+    are standardized, blocks weighted and rows L2-normalized, so a matrix product gives the
+    cosine similarity of every pair.
+
+    Neighbours can be precomputed for the whole catalog (and shipped in the snapshot), making a
+    lookup a slice of a flat table; otherwise they are computed on demand and the results for
+    popular activities are kept in an LRU cache. NumPy is only imported once the matrix is needed.
+    """
+
+    def __init__(self, items: List[ImprovActivity], neighbours: Optional[Sequence[int]] = None,
+                 scores: Optional[Sequence[float]] = None, width: int = 0):
+        self.items = items
+        # Precomputed neighbours: flat row-major tables of `width` entries per activity (-1 pads short rows)
+        self.neighbours = neighbours
+        self.scores = scores
+        self.width = width if neighbours is not None else 0
+        self._matrix: Any = None
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def matrix(self) -> Any:
+        """
+        Row-normalized float32 feature matrix, built on first use.
+        """
+        if self._matrix is None:
+            with self._lock:
+                if self._matrix is None:
+                    self._matrix = self._build_matrix()
+        return self._matrix
+
+    def similar(self, position: int, k: int) -> List[Tuple[int, float]]:
+        """
+        The k activities most similar to one, best first.
+
+        Args:
+            position (int): Catalog position of the activity
+            k (int): Number of neighbours (at most MAX_NEIGHBOURS)
+
+        Returns:
+            list: (position, cosine similarity) pairs, excluding the activity itself
+        """
+        if k <= self.width:
+            start = position * self.width
+            return [(self.neighbours[index], float(self.scores[index]))
+                    for index in range(start, start + k) if self.neighbours[index] >= 0]
+
+        with self._lock:
+            cached = self._cache.get(position)
+            if cached is not None:
+                self._cache.move_to_end(position)
+                return cached[:k]
+        neighbours, scores = self._top_k([position], MAX_NEIGHBOURS)
+        result = [(int(neighbour), float(score)) for neighbour, score in zip(neighbours[0], scores[0]) if neighbour >= 0]
+        with self._lock:
+            self._cache[position] = result
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result[:k]
+
+    def precompute(self, k: int) -> Tuple[Any, Any]:
+        """
+        Top-k neighbours of every activity, in batches of BATCH_SIZE rows.
+
+        Returns:
+            tuple: (neighbours int32, scores float32) arrays of shape (len(items), k); later
+            lookups for up to k neighbours are served from them
+        """
+        import numpy as np
+
+        k = min(k, max(len(self.items) - 1, 0))
+        neighbours = np.full((len(self.items), k), -1, dtype=np.int32)
+        scores = np.zeros((len(self.items), k), dtype=np.float32)
+        for start in range(0, len(self.items), BATCH_SIZE):
+            rows = range(start, min(start + BATCH_SIZE, len(self.items)))
+            neighbours[rows.start:rows.stop], scores[rows.start:rows.stop] = self._top_k(list(rows), k)
+        self.neighbours, self.scores, self.width = neighbours.ravel(), scores.ravel(), k
+        return neighbours, scores
+
+    def _top_k(self, rows: List[int], k: int) -> Tuple[Any, Any]:
+        """
+        Batched cosine top-k: one matrix product for the rows, then a partial sort per row.
+        """
+        import numpy as np
+
+        matrix = self.matrix
+        k = min(k, len(self.items) - 1)
+        if k <= 0:
+            return np.full((len(rows), 0), -1, dtype=np.int32), np.zeros((len(rows), 0), dtype=np.float32)
+        similarities = matrix[rows] @ matrix.T
+        # An activity is not its own neighbour
+        similarities[np.arange(len(rows)), rows] = -np.inf
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        # Order by score, then position, so equal scores come back in a stable order
+        order = np.lexsort((top, -top_scores), axis=1)
+        return np.take_along_axis(top, order, axis=1).astype(np.int32), np.take_along_axis(top_scores, order, axis=1)
+
+    def _build_matrix(self) -> Any:
+        import numpy as np
+
+        items = self.items
+        blocks = {
+            'tags': self._one_hot(items, 'tags', ActivityTag, multi=True),
+            'skills': self._one_hot(items, 'skills', ActivitySkill, multi=True),
+            'type': self._one_hot(items, 'type', ActivityType),
+            'field': self._one_hot(items, 'field', ActivityField),
+            'ordinals': np.array([
+                [list(enum).index(_get_path(activity, path)) / max(len(enum) - 1, 1) for path, enum in ORDINALS]
+                for activity in items
+            ], dtype=np.float32).reshape(len(items), len(ORDINALS)),
+            'ranges': np.log1p(np.array([
+                [activity.requirements.players.minimum, activity.requirements.players.recommended,
+                 activity.requirements.duration.minimum, activity.requirements.duration.average]
+                for activity in items
+            ], dtype=np.float32).reshape(len(items), 4)),
+        }
+        if TEXT_FEATURES > 0:
+            blocks['text'] = self._tf_idf(items)
+
+        columns = []
+        for name, block in blocks.items():
+            if block.shape[1] == 0:
+                continue
+            # Standardize columns so common values count for less, then give each block the same total variance
+            block = block - block.mean(axis=0)
+            deviation = block.std(axis=0)
+            block = block / np.where(deviation > 0, deviation, 1)
+            columns.append(block * (FEATURE_WEIGHTS[name] / math.sqrt(block.shape[1])))
+        matrix = np.hstack(columns).astype(np.float32) if columns else np.zeros((len(items), 1), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms > 0, norms, 1)
+        logger.info(f"Built similarity matrix {matrix.shape[0]}x{matrix.shape[1]}")
+        return matrix
+
+    @staticmethod
+    def _one_hot(items: List[ImprovActivity], attribute: str, enum: Any, multi: bool = False) -> Any:
+        import numpy as np
+
+        columns = {member: column for column, member in enumerate(enum)}
+        block = np.zeros((len(items), len(columns)), dtype=np.float32)
+        for row, activity in enumerate(items):
+            value = getattr(activity, attribute)
+            for member in (value if multi else (value,)):
+                block[row, columns[member]] = 1.0
+        return block
+
+    @staticmethod
+    def _tf_idf(items: List[ImprovActivity]) -> Any:
+        import numpy as np
+
+        documents = [Counter(tokenize(f"{activity.brief} {activity.summary}")) for activity in items]
+        document_frequency: Counter = Counter()
+        for terms in documents:
+            document_frequency.update(terms.keys())
+        limit = MAX_DOCUMENT_FREQUENCY * len(items)
+        vocabulary = [term for term, count in sorted(document_frequency.items(), key=lambda entry: (-entry[1], entry[0]))
+                      if count <= limit][:TEXT_FEATURES]
+        columns = {term: column for column, term in enumerate(vocabulary)}
+        idf = np.array([math.log(len(items) / document_frequency[term]) + 1 for term in vocabulary], dtype=np.float32)
+
+        block = np.zeros((len(items), len(vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(documents):
+            for term, count in terms.items():
+                column = columns.get(term)
+                if column is not None:
+                    block[row, column] = 1 + math.log(count)
+        block *= idf
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        return block / np.where(norms > 0, norms, 1)
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from lib.catalog import Catalog
+from lib.fragments import FragmentCache
+from lib.similarity import SimilarityIndex
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC | format version (u16) | header length (u32) | header JSON | sections...
+# The header records each section's [offset, length] relative to the end of the header.
+MAGIC = b'IIDXSNAP'
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct('<8sHI')
+
+class Snapshot:
+    """
+    Catalog snapshot loaded from a file produced by write_snapshot.
+
+    Sections:
+        fragments: newline-delimited pre-encoded JSON, one activity per line, in catalog order
+        state:     zlib-compressed pickle of the decoded activities and the filter/search indexes
+        body.<encoding>: precompressed full GET /activities response bodies (optional)
+        similar.neighbours / similar.scores: flat int32 / float32 tables of each activity's top
+                   `similar_k` neighbours (optional), read in place so lookups need no NumPy
+
+    The state section is a pickle, so snapshots must only be loaded from trusted build artifacts.
+    """
+
+    def __init__(self, header: Dict[str, Any], sections: Dict[str, memoryview]):
+        self.header = header
+        self._sections = sections
+
+    @property
+    def content_hash(self) -> str:
+        return self.header['content_hash']
+
+    @property
+    def watermark(self) -> str:
+        return self.header.get('watermark', '')
+
+    @property
+    def encodings(self) -> List[str]:
+        return [name.split('.', 1)[1] for name in self._sections if name.startswith('body.')]
+
+    def body(self, encoding: str) -> bytes:
+        return bytes(self._sections[f'body.{encoding}'])
+
+    def catalog(self, fragment_cache: FragmentCache) -> Catalog:
+        """
+        Rebuild the catalog, seeding the fragment cache so nothing is re-encoded.
+        The snapshot's search index is available as `catalog.search_index` without a rebuild.
+        """
+        state = pickle.loads(zlib.decompress(self._sections['state']))
+        activities = state['activities']
+        fragments = bytes(self._sections['fragments']).decode('utf-8').split('\n') if activities else []
+        fragment_cache.seed(activities, fragments)
+        similarity_index = None
+        if 'similar.neighbours' in self._sections:
+            similarity_index = SimilarityIndex(activities, self._sections['similar.neighbours'].cast('i'),
+                                               self._sections['similar.scores'].cast('f'), self.header['similar_k'])
+        catalog = Catalog(activities, fragment_cache, state['search_index'], state['filter_index'], similarity_index)
+        if catalog.version != self.header['catalog_version']:
+            raise ValueError("Snapshot catalog version does not match its contents")
+        # The shipped index already reflects this catalog, so mark it synced
+        state['search_index'].version = catalog.version
+        return catalog
+
+def load_snapshot(path: str) -> Snapshot:
+    """
+    Memory-map a snapshot file and parse its header.
+
+    Raises:
+        ValueError: If the file is not a snapshot, has an unsupported format or fails its content hash
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    magic, version, header_length = _PREAMBLE.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a catalog snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format {version} (expected {FORMAT_VERSION})")
+    header_end = _PREAMBLE.size + header_length
+    header = json.loads(bytes(view[_PREAMBLE.size:header_end]))
+
+    sections = {}
+    digest = hashlib.sha256()
+    for name, (offset, length) in header['sections'].items():
+        section = view[header_end + offset:header_end + offset + length]
+        digest.update(name.encode('utf-8'))
+        digest.update(section)
+        sections[name] = section
+    if digest.hexdigest() != header['content_hash']:
+        raise ValueError(f"Snapshot {path} failed its content hash check")
+
+    logger.info(f"Loaded catalog snapshot {path} ({header['count']} activities, created {header['created_at']})")
+    return Snapshot(header, sections)
+
+def write_snapshot(path: str, catalog: Catalog, bodies: Optional[Dict[str, bytes]] = None,
+                   similar_k: int = 0) -> Dict[str, Any]:
+    """
+    Write a catalog, its pre-encoded JSON and its indexes to a snapshot file.
+
+    Args:
+        path (str): Output file
+        catalog (Catalog): Catalog to export
+        bodies (dict, optional): Content encoding -> precompressed full GET /activities response body
+        similar_k (int): Neighbours to precompute per activity for GET /activities/{id}/similar (0 skips them)
+
+    Returns:
+        dict: The snapshot header
+    """
+    state = {
+        'activities': catalog.items,
+        'filter_index': catalog.filter_index,
+        'search_index': catalog.search_index,
+    }
+    sections = {
+        'fragments': '\n'.join(catalog.fragments).encode('utf-8'),
+        'state': zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 6),
+    }
+    for encoding, body in (bodies or {}).items():
+        sections[f'body.{encoding}'] = body
+    if similar_k > 0:
+        neighbours, scores = catalog.similarity_index.precompute(similar_k)
+        similar_k = neighbours.shape[1]
+        sections['similar.neighbours'] = neighbours.astype('=i4').tobytes()
+        sections['similar.scores'] = scores.astype('=f4').tobytes()
+
+    offsets = {}
+    position = 0
+    digest = hashlib.sha256()
+    for name, data in sections.items():
+        offsets[name] = [position, len(data)]
+        position += len(data)
+        digest.update(name.encode('utf-8'))
+        digest.update(data)
+
+    header = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'catalog_version': catalog.version,
+        'etag': catalog.etag(),
+        'watermark': catalog.watermark,
+        'count': len(catalog),
+        'similar_k': similar_k,
+        'content_hash': digest.hexdigest(),
+        'sections': offsets,
+    }
+    encoded_header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded_header)))
+        f.write(encoded_header)
+        for data in sections.values():
+            f.write(data)
+    os.replace(temporary_path, path)
+    return header
@@ -1,8 +1,15 @@
+import json
+from decimal import Decimal
 from enum import Enum
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional
 
 class ImprovActivity:
-    
+    __slots__ = (
+        'id', 'updated_at', 'name', 'brief', 'summary', 'description', 'tips', 'requirements',
+        'tags', 'skills', 'field', 'type', 'level', 'complexity', 'skill_ceiling',
+        'parent', 'variants', 'credits', 'sources'
+    )
+
     def __init__(self):
         self.id: str = ""
         self.updated_at: str = ""
@@ -15,7 +22,7 @@ class ImprovActivity:
         self.tips: ActivityTips = ActivityTips()
 
         self.requirements: ActivityRequirements = ActivityRequirements()
-        
+
         self.tags: set[ActivityTag] = set()
         self.skills: set[ActivitySkill] = set()
 
@@ -31,46 +38,195 @@ class ImprovActivity:
         self.credits: List[str] = []
         self.sources: List[str] = []
 
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'ImprovActivity':
+        """
+        Decode a DynamoDB item (as returned by the boto3 resource API).
+        Missing attributes keep their defaults; unknown attributes are ignored.
+
+        Raises:
+            ValueError: If an enum attribute holds an unknown value, a list attribute is not a list of
+                strings, a number is not whole, or id is missing
+        """
+        # Skip __init__: every attribute is assigned below, so building defaults would be wasted work
+        activity = cls.__new__(cls)
+        activity.id = item.get('id') or ""
+        if not activity.id:
+            raise ValueError("Activity item has no id")
+        activity.updated_at = item.get('updated_at') or ""
+
+        activity.name = _decode_list(item.get('name'), 'name')
+        activity.brief = item.get('brief') or ""
+        activity.summary = item.get('summary') or ""
+        activity.description = item.get('description') or ""
+
+        activity.tips = ActivityTips.from_item(item.get('tips') or {})
+        activity.requirements = ActivityRequirements.from_item(item.get('requirements') or {})
+
+        activity.tags = {_decode_enum(ACTIVITY_TAGS, value, 'tags') for value in _decode_collection(item.get('tags'), 'tags')}
+        activity.skills = {_decode_enum(ACTIVITY_SKILLS, value, 'skills') for value in _decode_collection(item.get('skills'), 'skills')}
+
+        activity.field = _decode_enum(ACTIVITY_FIELDS, item.get('field', 'short_form'), 'field')
+        activity.type = _decode_enum(ACTIVITY_TYPES, item.get('type', 'game'), 'type')
+        activity.level = _decode_enum(ACTIVITY_LEVELS, item.get('level', 'beginner'), 'level')
+        activity.complexity = _decode_enum(ACTIVITY_COMPLEXITIES, item.get('complexity', 'very_low'), 'complexity')
+        activity.skill_ceiling = _decode_enum(ACTIVITY_SKILL_CEILINGS, item.get('skill_ceiling', 'low'), 'skill_ceiling')
+
+        activity.parent = _decode_optional_str(item.get('parent'), 'parent')
+        activity.variants = _decode_list(item.get('variants'), 'variants')
+
+        activity.credits = _decode_list(item.get('credits'), 'credits')
+        activity.sources = _decode_list(item.get('sources'), 'sources')
+        return activity
+
+    def to_item(self) -> Dict[str, Any]:
+        """
+        Encode as a plain dict usable both as a DynamoDB item and as JSON (enums as values, sets as sorted lists).
+        """
+        return {
+            'id': self.id,
+            'updated_at': self.updated_at,
+            'name': self.name,
+            'brief': self.brief,
+            'summary': self.summary,
+            'description': self.description,
+            'tips': self.tips.to_item(),
+            'requirements': self.requirements.to_item(),
+            'tags': sorted(tag.value for tag in self.tags),
+            'skills': sorted(skill.value for skill in self.skills),
+            'field': self.field.value,
+            'type': self.type.value,
+            'level': self.level.value,
+            'complexity': self.complexity.value,
+            'skill_ceiling': self.skill_ceiling.value,
+            'parent': self.parent,
+            'variants': self.variants,
+            'credits': self.credits,
+            'sources': self.sources
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_item(), separators=(',', ':'), ensure_ascii=False)
+
 class ActivityTips():
+    __slots__ = ('generic', 'host', 'player')
+
     def __init__(self):
         self.generic: List[str] = []
         self.host: List[str] = []
         self.player: List[str] = []
-        
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'ActivityTips':
+        tips = cls.__new__(cls)
+        tips.generic = _decode_list(item.get('generic'), 'tips.generic')
+        tips.host = _decode_list(item.get('host'), 'tips.host')
+        tips.player = _decode_list(item.get('player'), 'tips.player')
+        return tips
+
+    def to_item(self) -> Dict[str, Any]:
+        return {'generic': self.generic, 'host': self.host, 'player': self.player}
+
 class ActivityRequirements():
+    __slots__ = ('players', 'duration', 'physicality', 'vocality')
+
     def __init__(self):
         self.players: PlayerRequirement = PlayerRequirement()
         self.duration: DurationRequirement = DurationRequirement()
         self.physicality: PhysicalityRequirement = PhysicalityRequirement()
         self.vocality: VocalityRequirement = VocalityRequirement()
 
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'ActivityRequirements':
+        requirements = cls.__new__(cls)
+        requirements.players = PlayerRequirement.from_item(item.get('players') or {})
+        requirements.duration = DurationRequirement.from_item(item.get('duration') or {})
+        requirements.physicality = PhysicalityRequirement.from_item(item.get('physicality') or {})
+        requirements.vocality = VocalityRequirement.from_item(item.get('vocality') or {})
+        return requirements
+
+    def to_item(self) -> Dict[str, Any]:
+        return {
+            'players': self.players.to_item(),
+            'duration': self.duration.to_item(),
+            'physicality': self.physicality.to_item(),
+            'vocality': self.vocality.to_item()
+        }
+
 class PlayerRequirement():
+    __slots__ = ('minimum', 'recommended')
 
     def __init__(self):
         self.minimum: int = 0
         self.recommended: int = 0
 
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'PlayerRequirement':
+        players = cls.__new__(cls)
+        players.minimum = _decode_int(item.get('minimum'), 'players.minimum')
+        players.recommended = _decode_int(item.get('recommended'), 'players.recommended')
+        return players
+
+    def to_item(self) -> Dict[str, Any]:
+        return {'minimum': self.minimum, 'recommended': self.recommended}
+
 class DurationRequirement():
+    __slots__ = ('minimum', 'average')
+
     def __init__(self):
         self.minimum: int = 0
         self.average: int = 0
 
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'DurationRequirement':
+        duration = cls.__new__(cls)
+        duration.minimum = _decode_int(item.get('minimum'), 'duration.minimum')
+        duration.average = _decode_int(item.get('average'), 'duration.average')
+        return duration
+
+    def to_item(self) -> Dict[str, Any]:
+        return {'minimum': self.minimum, 'average': self.average}
+
 class PhysicalityRequirement():
+    __slots__ = ('minimum', 'recommended')
+
     def __init__(self):
         self.minimum: PhysicalityLevel = PhysicalityLevel.HALF_BODY
         self.recommended: PhysicalityLevel = PhysicalityLevel.HALF_BODY
 
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'PhysicalityRequirement':
+        physicality = cls.__new__(cls)
+        physicality.minimum = _decode_enum(PHYSICALITY_LEVELS, item.get('minimum', 'half_body'), 'physicality.minimum')
+        physicality.recommended = _decode_enum(PHYSICALITY_LEVELS, item.get('recommended', 'half_body'), 'physicality.recommended')
+        return physicality
+
+    def to_item(self) -> Dict[str, Any]:
+        return {'minimum': self.minimum.value, 'recommended': self.recommended.value}
+
 class VocalityRequirement():
+    __slots__ = ('minimum', 'recommended')
+
     def __init__(self):
         self.minimum: VocalityLevel = VocalityLevel.VOCAL
         self.recommended: VocalityLevel = VocalityLevel.VOCAL
 
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'VocalityRequirement':
+        vocality = cls.__new__(cls)
+        vocality.minimum = _decode_enum(VOCALITY_LEVELS, item.get('minimum', 'vocal'), 'vocality.minimum')
+        vocality.recommended = _decode_enum(VOCALITY_LEVELS, item.get('recommended', 'vocal'), 'vocality.recommended')
+        return vocality
+
+    def to_item(self) -> Dict[str, Any]:
+        return {'minimum': self.minimum.value, 'recommended': self.recommended.value}
+
 class ActivityType(Enum):
     WARMUP = "warmup" # very brief and simple with no skill to learn
     EXERCISE = "exercise" # very specific game used to teach a specific skill
     DRILL = "drill" # repetitive game used to practice a specific skill
     GAME = "game" # full improv game with multiple potential skills
-    
+
 class ActivityField(Enum):
     SHORT_FORM = "short_form" # improv games built around the idea that a game has already been established
     LONG_FORM = "long_form" # improv games built around the idea of finding the game asychronously during play
@@ -127,3 +283,58 @@ class VocalityLevel(Enum):
     NONE = "none" # no vocalization required
     TEXT = "text" # can be done with text communication
     VOCAL = "vocal" # requires voice communication
+
+# Value -> member lookup tables used by the item codecs (faster than Enum(value) and no exception on the happy path)
+ACTIVITY_TYPES = {member.value: member for member in ActivityType}
+ACTIVITY_FIELDS = {member.value: member for member in ActivityField}
+ACTIVITY_TAGS = {member.value: member for member in ActivityTag}
+ACTIVITY_LEVELS = {member.value: member for member in ActivityLevel}
+ACTIVITY_COMPLEXITIES = {member.value: member for member in ActivityComplexity}
+ACTIVITY_SKILL_CEILINGS = {member.value: member for member in ActivitySkillCeiling}
+ACTIVITY_SKILLS = {member.value: member for member in ActivitySkill}
+PHYSICALITY_LEVELS = {member.value: member for member in PhysicalityLevel}
+VOCALITY_LEVELS = {member.value: member for member in VocalityLevel}
+
+def _decode_enum(lookup: Dict[str, Enum], value: Any, attribute: str) -> Any:
+    member = lookup.get(value)
+    if member is None:
+        raise ValueError(f"Invalid {attribute}: {value!r}")
+    return member
+
+def _decode_list(value: Any, attribute: str) -> List[str]:
+    # A bare string is iterable too; list() would silently split it into characters
+    if value is None:
+        return []
+    if not isinstance(value, (list, tuple)) or not all(isinstance(entry, str) for entry in value):
+        raise ValueError(f"Invalid {attribute}: expected a list of strings, got {value!r}")
+    return list(value)
+
+def _decode_collection(value: Any, attribute: str) -> Iterable[Any]:
+    # Tags and skills may be stored as a DynamoDB string set, which boto3 returns as a Python set
+    if value is None:
+        return ()
+    if not isinstance(value, (list, tuple, set, frozenset)):
+        raise ValueError(f"Invalid {attribute}: expected a list, got {value!r}")
+    return value
+
+def _decode_optional_str(value: Any, attribute: str) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid {attribute}: expected a string, got {value!r}")
+    return value
+
+def _decode_int(value: Any, attribute: str) -> int:
+    # boto3 returns every DynamoDB number as Decimal; int() alone would truncate 2.7 to 2
+    if value is None:
+        return 0
+    whole = False
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        try:
+            number = int(value)
+            whole = number == value
+        except (ValueError, OverflowError):
+            pass
+    if not whole:
+        raise ValueError(f"Invalid {attribute}: expected a whole number, got {value!r}")
+    return number